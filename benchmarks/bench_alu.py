@@ -0,0 +1,31 @@
+"""Compare the arithmetic ALU against the table-driven TableALU.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_alu
+"""
+import timeit
+
+from emulator.alu import ALU, TableALU
+
+PAIRS = [(a, b) for a in range(0, 0x100, 3) for b in range(0, 0x100, 5)]
+
+
+def exercise(alu):
+    add = alu.add
+    sub = alu.sub
+    for a, b in PAIRS:
+        add(a, b)
+        sub(a, b)
+        alu.zero_flag
+
+
+def main():
+    operations = 2 * len(PAIRS)
+    for name, alu in (("arith", ALU()), ("table", TableALU())):
+        best = min(timeit.repeat(lambda: exercise(alu), number=1, repeat=5))
+        print(f"{name:>5}: {best * 1e9 / operations:7.1f} ns/operation")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Compare the flat 256-entry dispatch list against a dict-based opcode lookup.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_dispatch
+"""
+import timeit
+
+from emulator.cpu import CPU
+
+# LDX #$FF / loop: DEX, STX $0200, BNE loop / JMP $0000
+PROGRAM = [0xA2, 0xFF, 0xCA, 0x8E, 0x00, 0x02, 0xD0, 0xFA, 0x4C, 0x00, 0x00]
+INSTRUCTIONS = 100_000
+
+
+def make_cpu():
+    cpu = CPU()
+    for address, byte in enumerate(PROGRAM):
+        cpu.memory.write_byte(address, byte)
+    return cpu
+
+
+def run_dict(cpu, count):
+    """The previous decode path: dict lookup plus a None check per step"""
+    get_pc = cpu.program_counter.get
+    read_byte = cpu.memory.read_byte
+    lookup = cpu.opcode_table.get
+    for _ in range(count):
+        opcode = read_byte(get_pc())
+        handler = lookup(opcode)
+        if handler is None:
+            raise NotImplementedError(f"Opcode {opcode:02X} not implemented")
+        handler()
+
+
+def run_list(cpu, count):
+    """The flat dispatch path: one list index per step"""
+    get_pc = cpu.program_counter.get
+    read_byte = cpu.memory.read_byte
+    dispatch = cpu._dispatch
+    for _ in range(count):
+        dispatch[read_byte(get_pc())]()
+
+
+def main():
+    for name, runner in (("dict", run_dict), ("list", run_list)):
+        cpu = make_cpu()
+        best = min(timeit.repeat(lambda: runner(cpu, INSTRUCTIONS), number=1, repeat=5))
+        print(f"{name:>5}: {best * 1e9 / INSTRUCTIONS:7.1f} ns/instruction")
+
+
+if __name__ == "__main__":
+    main()
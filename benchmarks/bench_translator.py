@@ -0,0 +1,34 @@
+"""Compare the CPU.run() interpreter against BlockTranslator.run().
+
+Run from the repository root:
+
+    python -m benchmarks.bench_translator
+"""
+import timeit
+
+from emulator.cpu import CPU
+from emulator.translator import BlockTranslator
+
+# LDX #$FF / loop: DEX, STX $0200, BNE loop / JMP $0000
+PROGRAM = [0xA2, 0xFF, 0xCA, 0x8E, 0x00, 0x02, 0xD0, 0xFA, 0x4C, 0x00, 0x00]
+INSTRUCTIONS = 100_000
+
+
+def make_cpu():
+    cpu = CPU()
+    for address, byte in enumerate(PROGRAM):
+        cpu.memory.write_byte(address, byte)
+    return cpu
+
+
+def main():
+    interpreted = make_cpu()
+    translated = make_cpu()
+    translator = BlockTranslator(translated)
+    for name, run in (("interp", interpreted.run), ("blocks", translator.run)):
+        best = min(timeit.repeat(lambda: run(max_steps=INSTRUCTIONS), number=1, repeat=5))
+        print(f"{name:>6}: {best * 1e9 / INSTRUCTIONS:7.1f} ns/instruction")
+
+
+if __name__ == "__main__":
+    main()
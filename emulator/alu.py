@@ -1,23 +1,254 @@
+from array import array
+
+# Flag positions in the 6502 status register
+FLAG_CARRY = 0x01
+FLAG_ZERO = 0x02
+FLAG_INTERRUPT = 0x04
+FLAG_DECIMAL = 0x08
+FLAG_BREAK = 0x10   # Only exists in status bytes pushed by BRK and PHP
+FLAG_UNUSED = 0x20  # Always set in pushed status bytes
+FLAG_OVERFLOW = 0x40
+FLAG_NEGATIVE = 0x80
+
+# Status bits the ALU stores as given rather than deriving from a result
+STORED_FLAGS = FLAG_INTERRUPT | FLAG_DECIMAL | FLAG_OVERFLOW
+
+
 class ALU:
+    """Arithmetic unit with lazily evaluated status flags.
+
+    add() and sub() only record their unmasked result; the zero, negative
+    and carry flags are derived from it when something actually reads them.
+    The interrupt-disable, decimal and overflow bits are kept as they are.
+    Every pending result lies in -0x100..0x1FF, where bit 8 alone is the
+    carry.
+    """
+
     def __init__(self):
-        self.zero_flag = False
-        self.negative_flag = False
-        self.carry_flag = False
+        self._result = None  # Pending unmasked result, None once flags are concrete
+        self._zero = False
+        self._negative = False
+        self._carry = False
+        self._stored = 0  # STORED_FLAGS bits
 
     def add(self, a, b):
         """Add two numbers using the ALU"""
         result = a + b
-        self.carry_flag = result > 0xFF
-        result = result & 0xFF
-        self.zero_flag = (result == 0x00)
-        self.negative_flag = (result & 0x80) != 0
-        return result
+        self._result = result
+        return result & 0xFF
 
     def sub(self, a, b):
         """Subtract two numbers using the ALU"""
         result = a - b
-        self.carry_flag = result < 0x00
-        result = result & 0xFF
-        self.zero_flag = (result == 0x00)
-        self.negative_flag = (result & 0x80) != 0
-        return result
+        self._result = result
+        return result & 0xFF
+
+    def adc(self, a, b):
+        """ADC: a + b, setting carry and overflow.
+
+        Like sbc(), this keeps the tree's arithmetic rather than the 6502's:
+        there is no carry-in, so programs can count down by adding $FF.
+        """
+        value = self.add(a, b)
+        self._set_stored(FLAG_OVERFLOW, (a ^ value) & (b ^ value) & 0x80)
+        return value
+
+    def sbc(self, a, b):
+        """SBC: a - b, setting overflow; no borrow-in, and carry means borrow, as after sub()"""
+        value = self.sub(a, b)
+        self._set_stored(FLAG_OVERFLOW, (a ^ b) & (a ^ value) & 0x80)
+        return value
+
+    def compare(self, a, b):
+        """CMP/CPX/CPY: zero and negative from a - b, carry set when a >= b"""
+        self._result = ((a - b) & 0x1FF) ^ 0x100
+
+    def shift_left(self, value, carry_in):
+        """ASL/ROL: shift *value* left, bit 7 goes to carry"""
+        result = (value << 1) | carry_in
+        self._result = result
+        return result & 0xFF
+
+    def shift_right(self, value, carry_in):
+        """LSR/ROR: shift *value* right, bit 0 goes to carry"""
+        result = (value >> 1) | (carry_in << 7) | ((value & 0x01) << 8)
+        self._result = result
+        return result & 0xFF
+
+    def bit(self, a, value):
+        """BIT: zero from a & value, negative and overflow from value"""
+        self._materialize()
+        self._zero = (a & value) == 0
+        self._negative = (value & FLAG_NEGATIVE) != 0
+        self._stored = (self._stored & ~FLAG_OVERFLOW) | (value & FLAG_OVERFLOW)
+
+    def status(self):
+        """Return the flags packed at their 6502 status-register bit positions"""
+        result = self._result
+        if result is None:
+            return ((FLAG_NEGATIVE if self._negative else 0)
+                    | (FLAG_ZERO if self._zero else 0)
+                    | (FLAG_CARRY if self._carry else 0)
+                    | self._stored)
+        return ((result & FLAG_NEGATIVE)
+                | (0 if result & 0xFF else FLAG_ZERO)
+                | (FLAG_CARRY if result >> 8 else 0)
+                | self._stored)
+
+    def set_status(self, value):
+        """Load every flag from a status byte, as PLP and RTI do"""
+        self._result = None
+        self._zero = bool(value & FLAG_ZERO)
+        self._negative = bool(value & FLAG_NEGATIVE)
+        self._carry = bool(value & FLAG_CARRY)
+        self._stored = value & STORED_FLAGS
+
+    def state(self):
+        """Return the flag state as a tuple for restore()"""
+        return (self._result, self._zero, self._negative, self._carry, self._stored)
+
+    def restore(self, state):
+        """Restore flag state captured by state()"""
+        self._result, self._zero, self._negative, self._carry, self._stored = state
+
+    def _materialize(self):
+        """Turn a pending result into concrete flag values"""
+        result = self._result
+        if result is not None:
+            self._zero = (result & 0xFF) == 0x00
+            self._negative = (result & 0x80) != 0
+            # A sum above 0xFF or a negative difference leaves bits above bit 7
+            self._carry = (result >> 8) != 0
+            self._result = None
+
+    @property
+    def zero_flag(self):
+        result = self._result
+        if result is None:
+            return self._zero
+        return (result & 0xFF) == 0x00
+
+    @zero_flag.setter
+    def zero_flag(self, value):
+        self._materialize()
+        self._zero = value
+
+    @property
+    def negative_flag(self):
+        result = self._result
+        if result is None:
+            return self._negative
+        return (result & 0x80) != 0
+
+    @negative_flag.setter
+    def negative_flag(self, value):
+        self._materialize()
+        self._negative = value
+
+    @property
+    def carry_flag(self):
+        result = self._result
+        if result is None:
+            return self._carry
+        return (result >> 8) != 0
+
+    @carry_flag.setter
+    def carry_flag(self, value):
+        self._materialize()
+        self._carry = value
+
+    @property
+    def interrupt_flag(self):
+        return bool(self._stored & FLAG_INTERRUPT)
+
+    @interrupt_flag.setter
+    def interrupt_flag(self, value):
+        self._set_stored(FLAG_INTERRUPT, value)
+
+    @property
+    def decimal_flag(self):
+        return bool(self._stored & FLAG_DECIMAL)
+
+    @decimal_flag.setter
+    def decimal_flag(self, value):
+        self._set_stored(FLAG_DECIMAL, value)
+
+    @property
+    def overflow_flag(self):
+        return bool(self._stored & FLAG_OVERFLOW)
+
+    @overflow_flag.setter
+    def overflow_flag(self, value):
+        self._set_stored(FLAG_OVERFLOW, value)
+
+    def _set_stored(self, flag, value):
+        if value:
+            self._stored |= flag
+        else:
+            self._stored &= ~flag
+
+
+def build_tables():
+    """Build the (add, sub) result tables, indexed by ``(a << 8) | b``.
+
+    Each entry is the 9-bit result: the low byte is the value, and bit 8
+    is the carry (or borrow).  That is exactly the form ALU keeps as its
+    pending result, so flags work the same way for both backends.
+    """
+    add = array("H", bytes(0x20000))
+    sub = array("H", bytes(0x20000))
+    for a in range(0x100):
+        base = a << 8
+        for b in range(0x100):
+            add[base | b] = (a + b) & 0x1FF
+            sub[base | b] = (a - b) & 0x1FF
+    return add, sub
+
+
+def save_tables(path, tables):
+    """Write *tables* to *path* as raw native-endian 16-bit entries"""
+    with open(path, "wb") as f:
+        for table in tables:
+            table.tofile(f)
+
+
+def load_tables(path):
+    """Read tables written by save_tables()"""
+    add = array("H")
+    sub = array("H")
+    with open(path, "rb") as f:
+        add.fromfile(f, 0x10000)
+        sub.fromfile(f, 0x10000)
+    return add, sub
+
+
+_tables = None
+
+
+class TableALU(ALU):
+    """ALU backend that replaces the arithmetic with one table lookup.
+
+    The tables are built on first use and shared by every instance, unless
+    prebuilt ones (for example from load_tables()) are passed in.
+    """
+
+    def __init__(self, tables=None):
+        global _tables
+        super().__init__()
+        if tables is None:
+            if _tables is None:
+                _tables = build_tables()
+            tables = _tables
+        self._add_table, self._sub_table = tables
+
+    def add(self, a, b):
+        """Add two numbers using the add table"""
+        result = self._add_table[(a << 8) | b]
+        self._result = result
+        return result & 0xFF
+
+    def sub(self, a, b):
+        """Subtract two numbers using the sub table"""
+        result = self._sub_table[(a << 8) | b]
+        self._result = result
+        return result & 0xFF
@@ -0,0 +1,246 @@
+"""Two-pass assembler for the instructions in emulator.opcodes.INSTRUCTIONS.
+
+One statement per line; everything after ``;`` is a comment::
+
+    COUNT = 5             ; constant
+            .org $0000
+            LDX #COUNT
+    loop:   DEX           ; label, optionally followed by a statement
+            STX $0200
+            BNE loop
+            BRK
+    table:  .byte $01, 2, %11, <loop, >loop
+            .word loop, $1234
+
+Operands use the usual 6502 syntax: ``#imm``, ``addr``, ``addr,X``,
+``addr,Y``, ``(addr)``, ``(zp,X)`` and ``(zp),Y``; shifts and rotates
+of the accumulator take ``A`` or no operand.  An address that is
+known in the first pass and below $100 picks the zero-page form when the
+instruction has one; forward references always use the absolute form.
+
+Numbers are $hex, %binary or decimal.  An operand may add and subtract
+numbers and labels, and a leading ``<`` or ``>`` takes its low or high
+byte.  Mnemonics are case-insensitive; labels are not.
+"""
+import re
+
+from emulator.opcodes import (
+    ABSOLUTE, ABSOLUTE_X, ABSOLUTE_Y, ACCUMULATOR, IMMEDIATE, IMPLIED, INDEXED_INDIRECT, INDIRECT,
+    INDIRECT_INDEXED, INSTRUCTIONS, OPERAND_SIZES, RELATIVE, ZERO_PAGE, ZERO_PAGE_X, ZERO_PAGE_Y,
+)
+
+# (mnemonic, mode) -> opcode, inverted from the CPU's instruction table
+OPCODES = {spec: opcode for opcode, spec in INSTRUCTIONS.items()}
+MODES = {}
+for _mnemonic, _mode in OPCODES:
+    MODES.setdefault(_mnemonic, []).append(_mode)
+
+_STATEMENT = re.compile(r"\s*(?:([A-Za-z_]\w*):)?\s*(?:([.A-Za-z_]\w*)(?:\s*(=)\s*|\s+|$)(.*))?$")
+_INDEX = re.compile(r"(.*?)\s*,\s*([XxYy])$")
+_TERM = re.compile(r"\s*([+-]?)\s*(\$[0-9A-Fa-f]+|%[01]+|\d+|[A-Za-z_]\w*)\s*")
+
+
+class AssemblyError(ValueError):
+    """Raised for source the assembler cannot encode"""
+    pass
+
+
+class Program:
+    """An assembled image: *code* belongs at *origin*"""
+    __slots__ = ("origin", "code", "labels")
+
+    def __init__(self, origin, code, labels):
+        self.origin = origin
+        self.code = code
+        self.labels = labels  # Labels and constants by name
+
+    def __len__(self):
+        return len(self.code)
+
+    def load(self, memory):
+        """Copy the image into *memory* with a single bulk load"""
+        memory.load(self.origin, self.code)
+
+
+def assemble(source, origin=0x0000):
+    """Assemble *source* into a Program starting at *origin*.
+
+    The first pass sizes every statement and assigns addresses to
+    labels; the second evaluates operands and emits bytes.  A ``.org``
+    before any code moves the origin; later ones may only move forward,
+    and the gap they leave is zero-filled.
+    """
+    symbols = {}
+    statements = []  # (line number, address, mnemonic or directive, mode, operand)
+    address = origin
+    for number, line in enumerate(source.splitlines(), start=1):
+        match = _STATEMENT.match(line.split(";", 1)[0])
+        if match is None:
+            raise AssemblyError(f"Line {number}: cannot parse {line.strip()!r}")
+        label, name, equals, operand = match.groups()
+        if label is not None:
+            _define(symbols, label, address, number)
+        if name is None:
+            continue
+        operand = operand.strip()
+        if equals:
+            _define(symbols, name, _evaluate(_parse(operand, number), symbols, number), number)
+            continue
+        directive = name.lower()
+        if directive == ".org":
+            target = _evaluate(_parse(operand, number), symbols, number)
+            if not statements:
+                origin = target  # Nothing emitted yet, so the image starts here
+            elif target < address:
+                raise AssemblyError(f"Line {number}: .org {target:#06x} moves backwards")
+            address = target
+        elif directive in (".byte", ".word"):
+            values = [_parse(item, number) for item in operand.split(",")]
+            statements.append((number, address, directive, None, values))
+            address += len(values) * (1 if directive == ".byte" else 2)
+        else:
+            mnemonic = name.upper()
+            mode, expression = _mode(mnemonic, operand, symbols, number)
+            statements.append((number, address, mnemonic, mode, expression))
+            address += 1 + OPERAND_SIZES[mode]
+        if address > 0x10000:
+            raise AssemblyError(f"Line {number}: code runs past $FFFF")
+
+    code = bytearray(address - origin)
+    for number, address, kind, mode, expression in statements:
+        offset = address - origin
+        if kind == ".byte":
+            for value in expression:
+                code[offset] = _byte(_evaluate(value, symbols, number), number)
+                offset += 1
+        elif kind == ".word":
+            for value in expression:
+                value = _evaluate(value, symbols, number)
+                code[offset:offset + 2] = _word(value, number).to_bytes(2, "little")
+                offset += 2
+        else:
+            code[offset] = OPCODES[kind, mode]
+            if OPERAND_SIZES[mode] == 0:
+                continue
+            value = _evaluate(expression, symbols, number)
+            if mode == IMMEDIATE:
+                code[offset + 1] = _byte(value, number)
+            elif mode == RELATIVE:
+                delta = value - (address + 2)
+                if not -0x80 <= delta <= 0x7F:
+                    raise AssemblyError(f"Line {number}: branch target {value:#06x} out of range")
+                code[offset + 1] = delta & 0xFF
+            elif OPERAND_SIZES[mode] == 1:
+                if not 0 <= value <= 0xFF:
+                    raise AssemblyError(f"Line {number}: {value:#x} is not a zero-page address")
+                code[offset + 1] = value
+            else:
+                code[offset + 1:offset + 3] = _word(value, number).to_bytes(2, "little")
+    return Program(origin, bytes(code), symbols)
+
+
+def _define(symbols, name, value, number):
+    if name in symbols:
+        raise AssemblyError(f"Line {number}: {name!r} is already defined")
+    symbols[name] = value
+
+
+def _mode(mnemonic, operand, symbols, number):
+    """Pick the addressing mode for *operand* and parse its expression"""
+    modes = MODES.get(mnemonic)
+    if modes is None:
+        raise AssemblyError(f"Line {number}: unknown instruction {mnemonic!r}")
+    text = operand
+    if not operand:
+        candidates = (IMPLIED, ACCUMULATOR)
+    elif operand in ("A", "a") and ACCUMULATOR in modes:
+        candidates, text = (ACCUMULATOR,), ""
+    elif operand.startswith("#"):
+        candidates, text = (IMMEDIATE,), operand[1:]
+    elif operand.startswith("("):
+        compact = operand.upper().replace(" ", "")
+        if compact.endswith(",X)"):
+            candidates, text = (INDEXED_INDIRECT,), operand[1:operand.rindex(",")]
+        elif compact.endswith("),Y"):
+            candidates, text = (INDIRECT_INDEXED,), operand[1:operand.rindex(")")]
+        elif compact.endswith(")"):
+            candidates, text = (INDIRECT,), operand[1:-1]
+        else:
+            candidates = ()
+    else:
+        match = _INDEX.match(operand)
+        if match is None:
+            candidates = (RELATIVE, ZERO_PAGE, ABSOLUTE)
+        elif match.group(2) in "Xx":
+            candidates, text = (ZERO_PAGE_X, ABSOLUTE_X), match.group(1)
+        else:
+            candidates, text = (ZERO_PAGE_Y, ABSOLUTE_Y), match.group(1)
+    candidates = [mode for mode in candidates if mode in modes]
+    if not candidates:
+        raise AssemblyError(f"Line {number}: {mnemonic} does not take {operand or 'no operand'!r}")
+    expression = _parse(text, number) if text else None
+    if not text:
+        return candidates[0], None
+    if RELATIVE in candidates:
+        return RELATIVE, expression
+    if len(candidates) == 2:
+        # Zero page when the address is already known to fit, else absolute
+        terms = expression[1]
+        if all(not isinstance(term, str) or term in symbols for _, term in terms):
+            if 0 <= _evaluate(expression, symbols, number) <= 0xFF:
+                return candidates[0], expression
+    return candidates[-1], expression
+
+
+def _parse(text, number):
+    """Split an operand into (selector, [(sign, term), ...])"""
+    text = text.strip()
+    selector = None
+    if text[:1] in ("<", ">"):
+        selector, text = text[0], text[1:]
+    terms = []
+    position = 0
+    while position < len(text):
+        match = _TERM.match(text, position)
+        if match is None or (terms and not match.group(1)):
+            raise AssemblyError(f"Line {number}: bad expression {text!r}")
+        sign, term = match.groups()
+        if term[0] == "$":
+            term = int(term[1:], 16)
+        elif term[0] == "%":
+            term = int(term[1:], 2)
+        elif term[0].isdigit():
+            term = int(term)
+        terms.append((sign == "-", term))
+        position = match.end()
+    if not terms:
+        raise AssemblyError(f"Line {number}: missing operand")
+    return selector, terms
+
+
+def _evaluate(expression, symbols, number):
+    selector, terms = expression
+    value = 0
+    for negative, term in terms:
+        if isinstance(term, str):
+            if term not in symbols:
+                raise AssemblyError(f"Line {number}: undefined label {term!r}")
+            term = symbols[term]
+        value = value - term if negative else value + term
+    if selector == "<":
+        return value & 0xFF
+    if selector == ">":
+        return (value >> 8) & 0xFF
+    return value
+
+
+def _byte(value, number):
+    if not -0x80 <= value <= 0xFF:
+        raise AssemblyError(f"Line {number}: {value} does not fit in a byte")
+    return value & 0xFF
+
+
+def _word(value, number):
+    if not 0 <= value <= 0xFFFF:
+        raise AssemblyError(f"Line {number}: {value} does not fit in a word")
+    return value
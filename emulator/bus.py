@@ -0,0 +1,125 @@
+from emulator.memory import PAGE_DEVICE, PAGE_SHIFT, PAGE_WATCHED, Memory, MemoryAccessError
+
+
+class Device:
+    """A memory-mapped device; offsets are relative to its mapped start"""
+
+    def read(self, offset):
+        return 0x00
+
+    def write(self, offset, value):
+        pass
+
+
+class ConsolePort(Device):
+    """Output port: every byte written is captured, and optionally echoed"""
+
+    def __init__(self, echo=None):
+        self.output = bytearray()
+        self.echo = echo  # Called with each byte as it is written
+
+    def write(self, offset, value):
+        self.output.append(value)
+        if self.echo is not None:
+            self.echo(value)
+
+    def text(self):
+        """Return the captured output decoded as ASCII"""
+        return self.output.decode("ascii", errors="replace")
+
+
+class CycleTimer(Device):
+    """Four-byte little-endian counter read from *clock*.
+
+    Reading offset 0 latches the current count, so a multi-byte read is
+    consistent; writing any offset restarts the count from zero.
+    """
+
+    def __init__(self, clock):
+        self.clock = clock
+        self._origin = clock()
+        self._latched = 0
+
+    def read(self, offset):
+        if offset == 0:
+            self._latched = (self.clock() - self._origin) & 0xFFFFFFFF
+        return (self._latched >> (8 * offset)) & 0xFF
+
+    def write(self, offset, value):
+        self._origin = self.clock()
+
+
+class Bus(Memory):
+    """Memory whose address ranges can be mapped to devices.
+
+    A table of 256 entries, one per page, holds the device mappings.
+    Accesses to pages with no device take the plain RAM path and pay a
+    single table check. ROM is RAM that has been loaded and then
+    write-protected, so reading it is just as fast. Bulk load() and
+    dump() always go to the backing RAM.
+    """
+
+    def _attach(self, data) -> None:
+        super()._attach(data)
+        self._page_devices = [None] * len(self._page_flags)
+
+    def map_device(self, start: int, end: int, device) -> None:
+        """Route addresses *start* up to (not including) *end* to *device*"""
+        self._check_address(start)
+        self._check_address(end - 1)
+        for page in range(start >> PAGE_SHIFT, ((end - 1) >> PAGE_SHIFT) + 1):
+            mappings = self._page_devices[page]
+            if mappings is None:
+                mappings = self._page_devices[page] = []
+            mappings.append((start, end, device))
+            self._page_flags[page] |= PAGE_DEVICE
+
+    def map_rom(self, start: int, data) -> None:
+        """Load *data* at *start* and make it read-only"""
+        self.load(start, data)
+        self.protect(start, start + len(data))
+
+    def _device_at(self, address):
+        for start, end, device in self._page_devices[address >> PAGE_SHIFT] or ():
+            if start <= address < end:
+                return start, device
+        return None
+
+    def read_byte(self, address: int) -> int:
+        """Read the byte at *address* from RAM or its mapped device"""
+        if not 0 <= address < len(self._data):
+            raise MemoryAccessError(f"Address {address:#06x} out of range")
+        if self._page_devices[address >> PAGE_SHIFT] is not None:
+            return self._read_device(address)
+        return self._data[address]
+
+    def fetch_byte(self, address: int) -> int:
+        """Unchecked read that still honours device mappings"""
+        if self._page_devices[address >> PAGE_SHIFT] is not None:
+            return self._read_device(address)
+        return self._data[address]
+
+    def read_word(self, address: int) -> int:
+        return self.read_byte(address) | (self.read_byte(address + 1) << 8)
+
+    def fetch_word(self, address: int) -> int:
+        return self.fetch_byte(address) | (self.fetch_byte((address + 1) & 0xFFFF) << 8)
+
+    def _read_device(self, address):
+        mapping = self._device_at(address)
+        if mapping is None:
+            return self._data[address]
+        start, device = mapping
+        return device.read(address - start)
+
+    def _write_flagged(self, page: int, address: int, value: int) -> None:
+        flags = self._page_flags[page]
+        if flags & PAGE_DEVICE:
+            mapping = self._device_at(address)
+            if mapping is not None:
+                start, device = mapping
+                device.write(address - start, value)
+                if flags & PAGE_WATCHED:
+                    self._notify_watches("write", address, value)
+                return
+        super()._write_flagged(page, address, value)
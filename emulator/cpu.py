@@ -1,235 +1,522 @@
-from emulator.alu import ALU
-from emulator.memory import Memory
-from emulator.register import Register8, Register16
+import asyncio
+import time
+
+from emulator.alu import ALU, FLAG_UNUSED
+from emulator.memory import PAGE_SHIFT, Memory
+from emulator.handlers import make_handler
+from emulator.opcodes import (
+    BRK_OPCODE, CYCLES, INSTRUCTIONS, INTERRUPT_CYCLES, IRQ_VECTOR, NMI_VECTOR, OPERAND_SIZES,
+)
+from emulator.register import RegisterFile, RegisterView
+from emulator.trace import CONCRETE, RECORD
+from emulator.translator import compile_block
+
+NO_LIMIT = float("inf")
+
+
+class Snapshot:
+    """Machine state captured by CPU.snapshot()"""
+    __slots__ = ("registers", "alu", "pages", "cycles")
+
+    def __init__(self, registers, alu, pages, cycles):
+        self.registers = registers  # (a, x, y, sp, pc)
+        self.alu = alu
+        self.pages = pages  # Memory pages, shared copy-on-write
+        self.cycles = cycles
+
+
+class Hit:
+    """Why run() stopped at a breakpoint or watchpoint"""
+    __slots__ = ("kind", "pc", "address", "value")
+
+    def __init__(self, kind, pc, address=None, value=None):
+        self.kind = kind  # "breakpoint", "read" or "write"
+        self.pc = pc  # Address of the instruction that triggered it
+        self.address = address
+        self.value = value
+
+    def __repr__(self):
+        if self.address is None:
+            return f"Hit({self.kind!r}, pc={self.pc:#06x})"
+        return f"Hit({self.kind!r}, pc={self.pc:#06x}, address={self.address:#06x}, value={self.value:#04x})"
 
 
 class CPU:
 
 
-    def __init__(self):
-        self.opcode_table = {
-            # Load instructions
-            0xA9: self._execute_lda_immediate,  # LDA #immediate
-            0xA2: self._execute_ldx_immediate,  # LDX #immediate
-            0xA0: self._execute_ldy_immediate,  # LDY #immediate
-
-            # Store instructions
-            0x8D: self._execute_sta_absolute,  # STA absolute
-            0x8E: self._execute_stx_absolute,  # STX absolute
-            0x8C: self._execute_sty_absolute,  # STY absolute
-
-            # Transfer instructions
-            0xAA: self._execute_tax,            # TAX
-            0xA8: self._execute_tay,            # TAY
-            0x8A: self._execute_txa,            # TXA
-            0x98: self._execute_tya,            # TYA
-
-            # Increment / Decrement instructions
-            0xE8: self._execute_inx,            # INX
-            0xC8: self._execute_iny,            # INY
-            0xCA: self._execute_dex,            # DEX
-            0x88: self._execute_dey,            # DEY
-
-            # Arithmetic instructions
-            0x69: self._execute_add_immediate,  # ADC #immediate
-            0xE9: self._execute_sub_immediate,  # SBC #immediate
-
-            # Branch instructions
-            0xD0: self._execute_bne,  # BNE (Branch if Not Equal)
-            0xF0: self._execute_beq,  # BEQ (Branch if Equal)
-
-            # Jump instructions
-            0x4C: self._execute_jmp_absolute,  # JMP absolute
-
-            # Other instructions
-            0xEA: self._execute_nop,  # NOP (No Operation)
-        }
-        self.accumulator = Register8()
-        self.program_counter = Register16()
-        self.stack_pointer = Register8()
-        self.x_register = Register8()
-        self.y_register = Register8()
-
-        self.memory = Memory()
-        self.alu = ALU()
+    def __init__(self, alu=None, memory=None):
+
+        # Handlers work on the register file directly; the views keep the
+        # Register8/Register16 get()/set() interface for everyone else
+        self.registers = RegisterFile()
+        self.accumulator = RegisterView(self.registers, "a")
+        self.program_counter = RegisterView(self.registers, "pc", 0xFFFF)
+        self.stack_pointer = RegisterView(self.registers, "sp")
+        self.x_register = RegisterView(self.registers, "x")
+        self.y_register = RegisterView(self.registers, "y")
+
+        self.memory = memory if memory is not None else Memory()
+        self.alu = alu if alu is not None else ALU()
         self.stack_pointer.set(0xFF)
 
-        # Build the opcode dispatch table (grouped by instruction type)
+        # One handler per documented opcode, generated from the instruction
+        # table in emulator.opcodes by emulator.handlers
+        self.opcode_table = {opcode: make_handler(self, opcode) for opcode in INSTRUCTIONS}
+
+        # Handlers return None, or extra cycles for a taken branch or a
+        # page crossing
+        self._dispatch = [self._execute_illegal] * 256
+        for opcode, handler in self.opcode_table.items():
+            self._dispatch[opcode] = handler
+
+        # Cycles executed so far, and the base cost of each opcode
+        self.cycles = 0
+        self.cycle_table = list(CYCLES)
+
+        # Pre-decoded (handler, operand, length) entries for read-only code,
+        # indexed by address; None until load_rom() is used
+        self._decoded = None
+        self._rom_regions = []  # (start, end) of every load_rom() call
+
+        # Optional instrumentation used by run(): an emulator.profiler.Profiler
+        # and an emulator.trace.TraceRecorder
+        self.profiler = None
+        self.tracer = None
+
+        # Breakpoints map a PC to a condition, or None to always stop;
+        # self.hit records what stopped the last debugged run()
+        self.breakpoints = {}
+        self.hit = None
+        self._watchpoints = set()  # (start, end) ranges passed to watch()
+        self._resume_pc = None  # Breakpoint to step over when run() resumes
+
+        # run() stops before BRK unless this is False, in which case BRK
+        # executes as a software interrupt through the IRQ vector
+        self.halt_on_brk = True
+        # Pending "nmi"/"irq" requests; the run loops only act when non-empty
+        self._interrupts = []
+
+    def irq(self):
+        """Request a maskable interrupt.
+
+        It is taken before the next instruction once the interrupt-disable
+        flag is clear, and stays pending until then.
+        """
+        if "irq" not in self._interrupts:
+            self._interrupts.append("irq")
+
+    def nmi(self):
+        """Request a non-maskable interrupt, taken before the next instruction"""
+        if "nmi" not in self._interrupts:
+            self._interrupts.append("nmi")
+
+    def _service_interrupts(self):
+        """Enter the handler of a deliverable interrupt; return the cycles used"""
+        pending = self._interrupts
+        if "nmi" in pending:
+            pending.remove("nmi")
+            vector = NMI_VECTOR
+        elif not self.alu.interrupt_flag:
+            pending.remove("irq")
+            vector = IRQ_VECTOR
+        else:
+            return 0
+        self._enter_interrupt(self.registers.pc, vector, FLAG_UNUSED)
+        return INTERRUPT_CYCLES
+
+    def _enter_interrupt(self, return_pc, vector, pushed_flags):
+        """Push *return_pc* and the status, mask IRQs and jump through *vector*"""
+        regs = self.registers
+        sp = regs.sp
+        store_byte = self.memory.store_byte
+        store_byte(0x100 | sp, return_pc >> 8)
+        store_byte(0x100 | ((sp - 1) & 0xFF), return_pc & 0xFF)
+        store_byte(0x100 | ((sp - 2) & 0xFF), self.alu.status() | pushed_flags)
+        regs.sp = (sp - 3) & 0xFF
+        self.alu.interrupt_flag = True
+        regs.pc = self.memory.fetch_word(vector)
+
+    def register_opcode(self, opcode, handler, cycles=2):
+        """Install *handler* as the implementation of *opcode*.
+
+        *handler* may return extra cycles beyond its base *cycles*.
+        """
+        if not 0 <= opcode <= 0xFF:
+            raise ValueError(f"Opcode {opcode:#x} out of range")
+        self.opcode_table[opcode] = handler
+        self._dispatch[opcode] = handler
+        self.cycle_table[opcode] = cycles
+
+    def add_breakpoint(self, pc, condition=None):
+        """Make run() stop before executing the instruction at *pc*.
+
+        With *condition*, run() only stops when ``condition(cpu)`` is true.
+        Resuming with run() steps over the breakpoint it stopped at.
+        """
+        self.breakpoints[pc & 0xFFFF] = condition
+
+    def remove_breakpoint(self, pc):
+        """Delete the breakpoint at *pc*, if any"""
+        self.breakpoints.pop(pc & 0xFFFF, None)
+
+    def watch(self, start, end=None, read=False, write=True):
+        """Make run() stop after an instruction that accesses *start*..*end*.
+
+        *end* defaults to a single byte.  The access is recorded in
+        self.hit.  Pre-decoded ROM entries have their operands folded in,
+        so fetching those does not count as a read.
+        """
+        end = start + 1 if end is None else end
+        self.memory.watch(start, end, self._on_watch, read, write)
+        self._watchpoints.add((start, end))
+
+    def unwatch(self, start, end=None):
+        """Remove the watchpoints set on *start*..*end* with watch()"""
+        end = start + 1 if end is None else end
+        self.memory.unwatch(start, end, self._on_watch)
+        self._watchpoints.discard((start, end))
+
+    def _on_watch(self, kind, address, value):
+        if self.hit is None:
+            self.hit = Hit(kind, self.registers.pc, address, value)
+
+    def load_rom(self, address, data):
+        """Load *data* at *address* as read-only code and pre-decode it.
+
+        The region rejects further writes with ReadOnlyMemoryError.  Every
+        instruction lying wholly inside it is compiled once with its operand
+        folded in, so run() skips fetch and decode at those addresses.
+        """
+        data = bytes(data)
+        end = address + len(data)
+        self.memory.load(address, data)
+        self.memory.protect(address, end)
+        if self._decoded is None:
+            self._decoded = [None] * 0x10000
+        self._rom_regions.append((address, end))
+        self._decode_rom(address, end)
+
+    def _decode_rom(self, start, end):
+        """Pre-decode the read-only code from *start* up to *end*"""
+        decoded = self._decoded
+        decoded[start:end] = [None] * (end - start)
+        # Linear sweep.  Instructions without a template stay interpreted but
+        # are still stepped over whole, so their operands are never decoded
+        # as opcodes; only unknown bytes are skipped one at a time.
+        fetch_byte = self.memory.fetch_byte
+        pc = start
+        while pc < end:
+            block = compile_block(self, pc, max_instructions=1)
+            if block is None or block.end > end:
+                instruction = INSTRUCTIONS.get(fetch_byte(pc))
+                pc += 1 if instruction is None else 1 + OPERAND_SIZES[instruction[1]]
+                continue
+            length = block.end - pc
+            if length == 1:
+                operand = None
+            elif length == 2:
+                operand = fetch_byte(pc + 1)
+            else:
+                operand = self.memory.fetch_word(pc + 1)
+            decoded[pc] = (block.run, operand, length)
+            pc += length
+
+    def snapshot(self):
+        """Capture registers, ALU flags and memory into a Snapshot"""
+        regs = self.registers
+        return Snapshot(
+            (regs.a, regs.x, regs.y, regs.sp, regs.pc),
+            self.alu.state(),
+            self.memory.snapshot(),
+            self.cycles,
+        )
+
+    def restore(self, snapshot):
+        """Return the machine to the state captured in *snapshot*"""
+        regs = self.registers
+        regs.a, regs.x, regs.y, regs.sp, regs.pc = snapshot.registers
+        self.alu.restore(snapshot.alu)
+        self.cycles = snapshot.cycles
+        memory = self.memory
+        if not self._rom_regions:
+            memory.restore(snapshot.pages)
+            return
+        # Restoring bypasses write protection, so ROM may have changed under
+        # its pre-decoded entries; only ROM pages need their generations
+        regions = [(start, end, range(start >> PAGE_SHIFT, ((end - 1) >> PAGE_SHIFT) + 1))
+                   for start, end in self._rom_regions]
+        generations = {page: memory.page_generation(page)
+                       for _, _, pages in regions for page in pages}
+        memory.restore(snapshot.pages)
+        for start, end, pages in regions:
+            if any(memory.page_changed_since(page, generations[page]) for page in pages):
+                self._decode_rom(start, end)
 
     def step(self):
         """Execute one CPU instruction (Fetch, Decode, Execute)"""
-        pc = self.program_counter.get()
-        opcode = self.memory.read_byte(pc)
-        handler = self.opcode_table.get(opcode)
-        if handler is None:
-            raise NotImplementedError(f"Opcode {opcode:02X} not implemented")
-        handler()
-
-    def _execute_lda_immediate(self):
-        """Load Accumulator with immediate value"""
-        # Format: [0x49, value]
-        # Read the value from PC+1
-        pc = self.program_counter.get()
-        value = self.memory.read_byte(pc + 1)
-        self.accumulator.set(value)
-        self.program_counter.set(pc + 2)
-
-    def _execute_ldx_immediate(self):
-        """Load X Index with immediate value"""
-        pc = self.program_counter.get()
-        value = self.memory.read_byte(pc + 1)
-        self.x_register.set(value)
-        self.program_counter.set(pc + 2)
-
-    def _execute_ldy_immediate(self):
-        """Load Y Index with immediate value"""
-        pc = self.program_counter.get()
-        value = self.memory.read_byte(pc + 1)
-        self.y_register.set(value)
-        self.program_counter.set(pc + 2)
-
-    def _execute_sta_absolute(self):
-        """Store accumulator value to absolute address"""
-        pc = self.program_counter.get()
-        addr_low = self.memory.read_byte(pc + 1)
-        addr_high = self.memory.read_byte(pc + 2)
-        address = (addr_high << 8) | addr_low
-        value = self.accumulator.get()
-        self.memory.write_byte(address, value)
-        self.program_counter.set(pc + 3)
-
-    def _execute_stx_absolute(self):
-        """Store X index value to absolute address"""
-        pc = self.program_counter.get()
-        addr_low = self.memory.read_byte(pc + 1)
-        addr_high = self.memory.read_byte(pc + 2)
-        address = (addr_high << 8) | addr_low
-        value = self.x_register.get()
-        self.memory.write_byte(address, value)
-        self.program_counter.set(pc + 3)
-
-    def _execute_sty_absolute(self):
-        """Store Y index value to absolute address"""
-        pc = self.program_counter.get()
-        addr_low = self.memory.read_byte(pc + 1)
-        addr_high = self.memory.read_byte(pc + 2)
-        address = (addr_high << 8) | addr_low
-        value = self.y_register.get()
-        self.memory.write_byte(address, value)
-        self.program_counter.set(pc + 3)
-
-    def _execute_tax(self):
-        """TAX - Transfer Accumulator to X"""
-        pc = self.program_counter.get()
-        accumulator_value = self.accumulator.get()
-        self.x_register.set(accumulator_value)
-        self.program_counter.set(pc + 1)
-
-    def _execute_tay(self):
-        """TAY - Transfer Accumulator to Y"""
-        pc = self.program_counter.get()
-        accumulator_value = self.accumulator.get()
-        self.y_register.set(accumulator_value)
-        self.program_counter.set(pc + 1)
-
-    def _execute_txa(self):
-        """TXA - Transfer X to Accumulator"""
-        pc = self.program_counter.get()
-        x_register_value = self.x_register.get()
-        self.accumulator.set(x_register_value)
-        self.program_counter.set(pc + 1)
-
-    def _execute_tya(self):
-        """TYA - Transfer Y to Accumulator"""
-        pc = self.program_counter.get()
-        y_register_value = self.y_register.get()
-        self.accumulator.set(y_register_value)
-        self.program_counter.set(pc + 1)
-
-    def _execute_inx(self):
-        """INX - Increment X register"""
-        pc = self.program_counter.get()
-        current = self.x_register.get()
-        result = self.alu.add(current, 0x01)
-        self.x_register.set(result)
-        self.program_counter.set(pc + 1)
-
-    def _execute_iny(self):
-        """INY - Increment Y register"""
-        pc = self.program_counter.get()
-        current = self.y_register.get()
-        result = self.alu.add(current, 0x01)
-        self.y_register.set(result)
-        self.program_counter.set(pc + 1)
-
-    def _execute_dex(self):
-        """DEX - Decrement X register"""
-        pc = self.program_counter.get()
-        current = self.x_register.get()
-        result = self.alu.sub(current, 0x01)
-        self.x_register.set(result)
-        self.program_counter.set(pc + 1)
-
-    def _execute_dey(self):
-        """DEY - Decrement Y register"""
-        pc = self.program_counter.get()
-        current = self.y_register.get()
-        result = self.alu.sub(current, 0x01)
-        self.y_register.set(result)
-        self.program_counter.set(pc + 1)
-
-    def _execute_add_immediate(self):
-        """ADD #$10 - Add immediate value to accumulator"""
-        pc = self.program_counter.get()
-        operand = self.memory.read_byte(pc + 1)
-        accumulator_value = self.accumulator.get()
-        result = self.alu.add(accumulator_value, operand)
-        self.accumulator.set(result)
-        self.program_counter.set(pc + 2)
-
-    def _execute_nop(self):
-        """NOP - No operation, just advance PC"""
-        pc = self.program_counter.get()
-        self.program_counter.set(pc + 1)
-
-    def _execute_jmp_absolute(self):
-        """JMP $0200 - Jump to absolute address"""
-        pc = self.program_counter.get()
-        addr_low = self.memory.read_byte(pc + 1)
-        addr_high = self.memory.read_byte(pc + 2)
-        target_address = (addr_high << 8) | addr_low
-        self.program_counter.set(target_address)
-
-    def _execute_bne(self):
-        """BNE $nn - Branch if Not Equal (zero flag clear)"""
-        pc = self.program_counter.get()
-        offset = self.memory.read_byte(pc + 1)
-
-        if offset >= 0x80:
-            offset -= 0x100 # Convert to negative
-
-        pc = pc + 2 # Move past the BNE instruction
-        if not self.alu.zero_flag:
-            pc += offset
-        self.program_counter.set(pc)
-
-    def _execute_beq(self):
-        """BNE $nn - Branch if Equal (zero flag true)"""
-        pc = self.program_counter.get()
-        offset = self.memory.read_byte(pc + 1)
-
-        if offset >= 0x80:
-            offset -= 0x100  # Convert to negative
-        pc = pc + 2  # Move past the BNE instruction
-        if self.alu.zero_flag:
-            pc += offset
-        self.program_counter.set(pc)
-
-    def _execute_sub_immediate(self):
-        """SUB #$nn - Subtract immediate value from accumulator"""
-        pc = self.program_counter.get()
-        operand = self.memory.read_byte(pc + 1)
-        accumulator_value = self.accumulator.get()
-        result = self.alu.sub(accumulator_value, operand)
-        self.accumulator.set(result)
-        self.program_counter.set(pc + 2)
\ No newline at end of file
+        if self._interrupts:
+            self.cycles += self._service_interrupts()
+        opcode = self.memory.fetch_byte(self.registers.pc)
+        extra = self._dispatch[opcode]()
+        self.cycles += self.cycle_table[opcode] + (extra or 0)
+
+    def run(self, max_steps=None, until_pc=None, max_cycles=None):
+        """Execute instructions in a tight loop and return how many ran.
+
+        Execution halts before a BRK opcode (unless halt_on_brk is False),
+        when the PC reaches *until_pc*, once *max_steps* instructions have
+        executed or once this call has used at least *max_cycles* cycles.
+        Unknown opcodes raise ``NotImplementedError`` exactly like
+        ``step()``.  Breakpoints and watchpoints also stop it, leaving the
+        reason in self.hit.
+        """
+        self.hit = None
+        if self.profiler is not None or self.breakpoints or self._watchpoints:
+            return self._run_instrumented(max_steps, until_pc, max_cycles)
+        if self.tracer is not None:
+            return self._run_traced(max_steps, until_pc, max_cycles)
+        if self._decoded is not None:
+            return self._run_decoded(max_steps, until_pc, max_cycles)
+        # Cache every attribute lookup the loop would otherwise repeat
+        regs = self.registers
+        fetch_byte = self.memory.fetch_byte
+        dispatch = self._dispatch
+        cycle_table = self.cycle_table
+        cycles = self.cycles
+        cycle_limit = NO_LIMIT if max_cycles is None else cycles + max_cycles
+        interrupts = self._interrupts
+        halt_opcode = BRK_OPCODE if self.halt_on_brk else None
+        steps = 0
+        try:
+            while steps != max_steps and cycles < cycle_limit:
+                if interrupts:
+                    cycles += self._service_interrupts()
+                pc = regs.pc
+                if pc == until_pc:
+                    break
+                opcode = fetch_byte(pc)
+                if opcode == halt_opcode:
+                    break
+                extra = dispatch[opcode]()
+                cycles += cycle_table[opcode]
+                if extra:
+                    cycles += extra
+                steps += 1
+        finally:
+            self.cycles = cycles
+        return steps
+
+    async def run_async(self, slice_steps=1000, max_steps=None, until_pc=None,
+                        timeout=None, hooks=(), max_cycles=None):
+        """Cooperative run(): yield to the event loop every *slice_steps*.
+
+        Halts on the same conditions as run(), with *max_cycles* counted
+        across the whole call, and returns the total number of
+        instructions executed.  After each slice every async callable in
+        *hooks* is awaited with this CPU, which lets devices flush their
+        output or wait for input.  Raises TimeoutError once *timeout*
+        seconds have passed; cancelling the task stops it at the next
+        slice boundary.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        cycle_limit = NO_LIMIT if max_cycles is None else self.cycles + max_cycles
+        steps = 0
+        while steps != max_steps and self.cycles < cycle_limit:
+            budget = slice_steps if max_steps is None else min(slice_steps, max_steps - steps)
+            cycles_left = None if max_cycles is None else cycle_limit - self.cycles
+            executed = self.run(max_steps=budget, until_pc=until_pc, max_cycles=cycles_left)
+            steps += executed
+            for hook in hooks:
+                await hook(self)
+            if executed < budget:
+                break  # Halted on BRK, until_pc or the cycle budget
+            if deadline is not None and loop.time() >= deadline:
+                raise TimeoutError(f"CPU still running after {timeout}s ({steps} steps)")
+            await asyncio.sleep(0)
+        return steps
+
+    def _run_decoded(self, max_steps, until_pc, max_cycles):
+        """run() variant that executes pre-decoded ROM entries directly"""
+        regs = self.registers
+        fetch_byte = self.memory.fetch_byte
+        dispatch = self._dispatch
+        cycle_table = self.cycle_table
+        decoded = self._decoded
+        cycles = self.cycles
+        cycle_limit = NO_LIMIT if max_cycles is None else cycles + max_cycles
+        interrupts = self._interrupts
+        halt_opcode = BRK_OPCODE if self.halt_on_brk else None
+        steps = 0
+        try:
+            while steps != max_steps and cycles < cycle_limit:
+                if interrupts:
+                    cycles += self._service_interrupts()
+                pc = regs.pc
+                if pc == until_pc:
+                    break
+                entry = decoded[pc]
+                if entry is not None:
+                    cycles += entry[0]()  # Compiled entries return their cycles
+                    steps += 1
+                    continue
+                opcode = fetch_byte(pc)
+                if opcode == halt_opcode:
+                    break
+                extra = dispatch[opcode]()
+                cycles += cycle_table[opcode]
+                if extra:
+                    cycles += extra
+                steps += 1
+        finally:
+            self.cycles = cycles
+        return steps
+
+    def _run_traced(self, max_steps, until_pc, max_cycles):
+        """run() variant that records every instruction into self.tracer"""
+        tracer = self.tracer
+        pack = RECORD.pack_into
+        record_size = RECORD.size
+        trace_buffer = tracer.buffer
+        trace_size = len(trace_buffer)
+        cursor = tracer.cursor
+        alu = self.alu
+        status = alu.status
+        regs = self.registers
+        fetch_byte = self.memory.fetch_byte
+        dispatch = self._dispatch
+        decoded = self._decoded
+        cycle_table = self.cycle_table
+        cycles = self.cycles
+        cycle_limit = NO_LIMIT if max_cycles is None else cycles + max_cycles
+        interrupts = self._interrupts
+        halt_opcode = BRK_OPCODE if self.halt_on_brk else None
+        steps = 0
+        try:
+            while steps != max_steps and cycles < cycle_limit:
+                if interrupts:
+                    cycles += self._service_interrupts()
+                pc = regs.pc
+                if pc == until_pc:
+                    break
+                opcode = fetch_byte(pc)
+                if opcode == halt_opcode:
+                    break
+                # The raw ALU result, as trace.flag_word() packs it;
+                # records() derives the status byte
+                result = alu._result
+                pack(trace_buffer, cursor, pc, opcode, regs.a, regs.x, regs.y,
+                     CONCRETE | status() if result is None else (result & 0x1FF) | (alu._stored << 9))
+                cursor += record_size
+                if cursor == trace_size:
+                    cursor = 0
+                steps += 1  # Before executing, so a faulting instruction stays in the trace
+                entry = None if decoded is None else decoded[pc]
+                if entry is not None:
+                    cycles += entry[0]()
+                    continue
+                extra = dispatch[opcode]()
+                cycles += cycle_table[opcode]
+                if extra:
+                    cycles += extra
+        finally:
+            self.cycles = cycles
+            tracer.cursor = cursor
+            tracer.count += steps
+        return steps
+
+    def _run_instrumented(self, max_steps, until_pc, max_cycles):
+        """run() variant for the profiler, breakpoints and watchpoints, and the tracer alongside them"""
+        profiler = self.profiler
+        if profiler is not None:
+            counts = profiler.opcode_counts
+            hits = profiler.pc_hits
+            sample_every = profiler.sample_every
+            time_ns = profiler.opcode_time_ns
+            samples = profiler.opcode_samples
+            clock = time.perf_counter_ns
+            countdown = sample_every
+        tracer = self.tracer
+        if tracer is not None:
+            pack = RECORD.pack_into
+            trace_buffer = tracer.buffer
+            trace_size = len(trace_buffer)
+            cursor = tracer.cursor
+            alu = self.alu
+            status = alu.status
+        recorded = 0
+        breakpoints = self.breakpoints
+        watching = bool(self._watchpoints)
+        resume_pc = self._resume_pc
+        self._resume_pc = None
+        regs = self.registers
+        fetch_byte = self.memory.fetch_byte
+        dispatch = self._dispatch
+        decoded = self._decoded
+        cycle_table = self.cycle_table
+        cycles = self.cycles
+        cycle_limit = NO_LIMIT if max_cycles is None else cycles + max_cycles
+        interrupts = self._interrupts
+        halt_opcode = BRK_OPCODE if self.halt_on_brk else None
+        steps = 0
+        try:
+            while steps != max_steps and cycles < cycle_limit:
+                if interrupts:
+                    cycles += self._service_interrupts()
+                pc = regs.pc
+                if pc == until_pc:
+                    break
+                if breakpoints and pc in breakpoints and (steps or pc != resume_pc):
+                    condition = breakpoints[pc]
+                    if condition is None or condition(self):
+                        self.hit = Hit("breakpoint", pc)
+                        self._resume_pc = pc
+                        break
+                opcode = fetch_byte(pc)
+                if opcode == halt_opcode:
+                    break
+                if tracer is not None:
+                    result = alu._result  # Packed as trace.flag_word() does
+                    pack(trace_buffer, cursor, pc, opcode, regs.a, regs.x, regs.y,
+                         CONCRETE | status() if result is None else (result & 0x1FF) | (alu._stored << 9))
+                    cursor += RECORD.size
+                    if cursor == trace_size:
+                        cursor = 0
+                    recorded += 1
+                # Pre-decoded ROM entries run here too, so debugging does not
+                # slow code it is not looking at
+                entry = None if decoded is None else decoded[pc]
+                handler = dispatch[opcode] if entry is None else entry[0]
+                if profiler is None:
+                    extra = handler()
+                else:
+                    countdown -= 1
+                    if countdown == 0:
+                        countdown = sample_every
+                        started = clock()
+                        extra = handler()
+                        time_ns[opcode] += clock() - started
+                        samples[opcode] += 1
+                    else:
+                        extra = handler()
+                    counts[opcode] += 1
+                    hits[pc] += 1
+                if entry is not None:
+                    extra -= cycle_table[opcode]  # Entries return their full cost
+                cycles += cycle_table[opcode]
+                if extra:
+                    cycles += extra
+                steps += 1
+                if watching and self.hit is not None:
+                    break
+        finally:
+            self.cycles = cycles
+            if tracer is not None:
+                tracer.cursor = cursor
+                tracer.count += recorded
+        return steps
+
+    def _execute_illegal(self):
+        """Fill every unused dispatch slot; raises for the opcode at PC"""
+        opcode = self.memory.fetch_byte(self.registers.pc)
+        raise NotImplementedError(f"Opcode {opcode:02X} not implemented")
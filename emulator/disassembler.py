@@ -0,0 +1,115 @@
+from emulator.memory import PAGE_SHIFT, PAGE_SIZE
+from emulator.opcodes import (
+    ABSOLUTE, ABSOLUTE_X, ABSOLUTE_Y, ACCUMULATOR, IMMEDIATE, IMPLIED, INDEXED_INDIRECT, INDIRECT,
+    INDIRECT_INDEXED, INSTRUCTIONS, OPERAND_SIZES, RELATIVE, ZERO_PAGE, ZERO_PAGE_X, ZERO_PAGE_Y,
+)
+
+# Operand syntax per mode, matching what emulator.assembler accepts
+OPERAND_FORMATS = {
+    IMPLIED: "",
+    ACCUMULATOR: " A",
+    IMMEDIATE: " #${:02X}",
+    ZERO_PAGE: " ${:02X}",
+    ZERO_PAGE_X: " ${:02X},X",
+    ZERO_PAGE_Y: " ${:02X},Y",
+    ABSOLUTE: " ${:04X}",
+    ABSOLUTE_X: " ${:04X},X",
+    ABSOLUTE_Y: " ${:04X},Y",
+    INDIRECT: " (${:04X})",
+    INDEXED_INDIRECT: " (${:02X},X)",
+    INDIRECT_INDEXED: " (${:02X}),Y",
+    RELATIVE: " ${:04X}",  # Shown as the resolved target
+}
+
+
+class Instruction:
+    """One decoded instruction; *mnemonic* is None for an unknown opcode"""
+    __slots__ = ("address", "opcode", "mnemonic", "mode", "operand", "length", "target")
+
+    def __init__(self, address, opcode, mnemonic, mode, operand, length, target):
+        self.address = address
+        self.opcode = opcode
+        self.mnemonic = mnemonic
+        self.mode = mode
+        self.operand = operand  # Raw operand value, or None
+        self.length = length
+        self.target = target  # Where a branch, jump or JSR goes, or None
+
+    def __str__(self):
+        if self.mnemonic is None:
+            return f".byte ${self.opcode:02X}"
+        operand = self.target if self.mode == RELATIVE else self.operand
+        return self.mnemonic + OPERAND_FORMATS[self.mode].format(operand)
+
+
+class Disassembler:
+    """Decode instructions from *memory*, caching them by address.
+
+    The cache is kept per 256-byte page together with the page's write
+    generation, so a write anywhere in a page drops that page's decodings
+    the next time one of them is asked for.  Nothing is hooked into the
+    write path.  Instructions that straddle two pages are never cached.
+    Bytes are read straight from the backing RAM, so decoding never
+    touches a mapped device or fires a read watchpoint.
+    """
+
+    def __init__(self, memory):
+        self.memory = memory
+        self._pages = {}  # page -> (generation, {address: Instruction})
+
+    def decode(self, address):
+        """Return the Instruction at *address*"""
+        page = address >> PAGE_SHIFT
+        generation = self.memory.page_generation(page)
+        cached = self._pages.get(page)
+        if cached is None or cached[0] != generation:
+            cached = self._pages[page] = (generation, {})
+        instruction = cached[1].get(address)
+        if instruction is None:
+            instruction = self._decode(address)
+            if (address & (PAGE_SIZE - 1)) + instruction.length <= PAGE_SIZE:
+                cached[1][address] = instruction
+        return instruction
+
+    def disassemble(self, start, end):
+        """Linear sweep: decode every instruction from *start* up to *end*"""
+        instructions = []
+        address = start
+        while address < end:
+            instruction = self.decode(address)
+            instructions.append(instruction)
+            address += instruction.length
+        return instructions
+
+    def format(self, address):
+        """Return a listing line: address, raw bytes and the instruction"""
+        instruction = self.decode(address)
+        ram = self.memory._data
+        raw = " ".join(f"{ram[(address + i) & 0xFFFF]:02X}" for i in range(instruction.length))
+        return f"{address:04X}  {raw:<8}  {instruction}"
+
+    def format_trace(self, records):
+        """Render TraceRecorder records, decoded from memory as it is now"""
+        return [f"{pc:04X}  {str(self.decode(pc)):<12}  A={a:02X} X={x:02X} Y={y:02X} P={flags:02X}"
+                for pc, _, a, x, y, flags in records]
+
+    def _decode(self, address):
+        ram = self.memory._data
+        opcode = ram[address]
+        spec = INSTRUCTIONS.get(opcode)
+        if spec is None:
+            return Instruction(address, opcode, None, None, None, 1, None)
+        mnemonic, mode = spec
+        size = OPERAND_SIZES[mode]
+        operand = None
+        if size == 1:
+            operand = ram[(address + 1) & 0xFFFF]
+        elif size == 2:
+            operand = ram[(address + 1) & 0xFFFF] | (ram[(address + 2) & 0xFFFF] << 8)
+        target = None
+        if mode == RELATIVE:
+            offset = operand - 0x100 if operand >= 0x80 else operand
+            target = (address + 2 + offset) & 0xFFFF
+        elif mnemonic in ("JMP", "JSR") and mode == ABSOLUTE:
+            target = operand
+        return Instruction(address, opcode, mnemonic, mode, operand, 1 + size, target)
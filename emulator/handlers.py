@@ -0,0 +1,226 @@
+"""Interpreter handlers generated from the instruction table.
+
+Every addressing mode has one source fragment that computes the operand's
+effective address, and every mnemonic one fragment that performs it.
+make_handler() splices the two, with the cycle rules from
+emulator.opcodes, into a single straight-line function per opcode, so no
+generated handler calls a shared fetch helper at run time.
+"""
+from emulator.alu import FLAG_BREAK, FLAG_UNUSED
+from emulator.opcodes import (
+    ABSOLUTE, ABSOLUTE_X, ABSOLUTE_Y, ACCUMULATOR, IMMEDIATE, IMPLIED, INDEXED_INDIRECT, INDIRECT,
+    INDIRECT_INDEXED, INSTRUCTIONS, IRQ_VECTOR, OPERAND_SIZES, PAGE_PENALTY, RELATIVE, ZERO_PAGE,
+    ZERO_PAGE_X, ZERO_PAGE_Y,
+)
+
+# Effective-address code per mode, reading the operand at PC + 1.  Indexed
+# modes keep the unindexed *base* so reads can charge a page crossing.
+# Accessors are looked up on *memory* per call, since Memory swaps in
+# wrapped readers while a read watchpoint is set.
+ADDRESS_MODES = {
+    ZERO_PAGE: "address = memory.fetch_byte((pc + 1) & 0xFFFF)",
+    ZERO_PAGE_X: "address = (memory.fetch_byte((pc + 1) & 0xFFFF) + regs.x) & 0xFF",
+    ZERO_PAGE_Y: "address = (memory.fetch_byte((pc + 1) & 0xFFFF) + regs.y) & 0xFF",
+    ABSOLUTE: "address = memory.fetch_word((pc + 1) & 0xFFFF)",
+    ABSOLUTE_X: "base = memory.fetch_word((pc + 1) & 0xFFFF)\n"
+                "address = (base + regs.x) & 0xFFFF",
+    ABSOLUTE_Y: "base = memory.fetch_word((pc + 1) & 0xFFFF)\n"
+                "address = (base + regs.y) & 0xFFFF",
+    # The pointer's high byte wraps within zero page
+    INDEXED_INDIRECT: "pointer = (memory.fetch_byte((pc + 1) & 0xFFFF) + regs.x) & 0xFF\n"
+                      "address = memory.fetch_byte(pointer) | (memory.fetch_byte((pointer + 1) & 0xFF) << 8)",
+    INDIRECT_INDEXED: "pointer = memory.fetch_byte((pc + 1) & 0xFFFF)\n"
+                      "base = memory.fetch_byte(pointer) | (memory.fetch_byte((pointer + 1) & 0xFF) << 8)\n"
+                      "address = (base + regs.y) & 0xFFFF",
+    # Like the NMOS 6502, a pointer at $xxFF takes its high byte from $xx00
+    INDIRECT: "pointer = memory.fetch_word((pc + 1) & 0xFFFF)\n"
+              "address = memory.fetch_byte(pointer) | (memory.fetch_byte((pointer & 0xFF00) | ((pointer + 1) & 0xFF)) << 8)",
+}
+
+READ = "read"      # Uses *value*, the operand byte
+WRITE = "write"    # Stores to *address*
+MODIFY = "modify"  # Turns *value* into *result*, written back to the operand
+BRANCH = "branch"  # Source is the condition for taking the branch
+JUMP = "jump"      # Sets the PC itself
+OTHER = "other"    # No operand
+
+# Sets zero and negative from the byte {0} and keeps the carry: loads,
+# transfers, pulls, increments and logic operations all end with this.
+# It writes the pending ALU result directly, as the templates do, since
+# a method call here would slow the commonest handlers.
+LOAD_FLAGS = ("r = alu._result\n"
+              "alu._result = {0} | (r & 0x100 if r is not None else alu._carry << 8)")
+
+
+def _load(target, expression):
+    """Source assigning *expression* to *target* and setting flags from it"""
+    if target.isidentifier():
+        return f"{target} = {expression}\n" + LOAD_FLAGS.format(target)
+    if expression.isidentifier():
+        return f"{target} = {expression}\n" + LOAD_FLAGS.format(expression)
+    return f"value = {expression}\n{target} = value\n" + LOAD_FLAGS.format("value")
+
+
+# mnemonic -> (kind, source).  Flags follow the 6502 except in ADC and
+# SBC, which keep this tree's arithmetic: neither takes a carry-in, and
+# carry after SBC means borrow (see ALU.adc() and ALU.sbc()).
+# The stack lives in page 0x01: pulls index *ram* directly and pushes go
+# through store_byte() so page generations stay correct.
+OPERATIONS = {
+    "LDA": (READ, _load("regs.a", "value")),
+    "LDX": (READ, _load("regs.x", "value")),
+    "LDY": (READ, _load("regs.y", "value")),
+    "ADC": (READ, "regs.a = alu.adc(regs.a, value)"),
+    "SBC": (READ, "regs.a = alu.sbc(regs.a, value)"),
+    "AND": (READ, _load("regs.a", "regs.a & value")),
+    "ORA": (READ, _load("regs.a", "regs.a | value")),
+    "EOR": (READ, _load("regs.a", "regs.a ^ value")),
+    "CMP": (READ, "alu.compare(regs.a, value)"),
+    "CPX": (READ, "alu.compare(regs.x, value)"),
+    "CPY": (READ, "alu.compare(regs.y, value)"),
+    "BIT": (READ, "alu.bit(regs.a, value)"),
+
+    "STA": (WRITE, "memory.store_byte(address, regs.a)"),
+    "STX": (WRITE, "memory.store_byte(address, regs.x)"),
+    "STY": (WRITE, "memory.store_byte(address, regs.y)"),
+
+    "ASL": (MODIFY, "result = alu.shift_left(value, 0)"),
+    "ROL": (MODIFY, "result = alu.shift_left(value, alu.carry_flag)"),
+    "LSR": (MODIFY, "result = alu.shift_right(value, 0)"),
+    "ROR": (MODIFY, "result = alu.shift_right(value, alu.carry_flag)"),
+    "INC": (MODIFY, _load("result", "(value + 1) & 0xFF")),
+    "DEC": (MODIFY, _load("result", "(value - 1) & 0xFF")),
+
+    "BPL": (BRANCH, "not alu.negative_flag"),
+    "BMI": (BRANCH, "alu.negative_flag"),
+    "BVC": (BRANCH, "not alu.overflow_flag"),
+    "BVS": (BRANCH, "alu.overflow_flag"),
+    "BCC": (BRANCH, "not alu.carry_flag"),
+    "BCS": (BRANCH, "alu.carry_flag"),
+    "BNE": (BRANCH, "not alu.zero_flag"),
+    "BEQ": (BRANCH, "alu.zero_flag"),
+
+    "JMP": (JUMP, "regs.pc = address"),
+    "JSR": (JUMP, "return_address = (pc + 2) & 0xFFFF  # Last byte of the JSR\n"
+                  "sp = regs.sp\n"
+                  "memory.store_byte(0x100 | sp, return_address >> 8)\n"
+                  "memory.store_byte(0x100 | ((sp - 1) & 0xFF), return_address & 0xFF)\n"
+                  "regs.sp = (sp - 2) & 0xFF\n"
+                  "regs.pc = address"),
+    "RTS": (JUMP, "sp = regs.sp\n"
+                  "low = ram[0x100 | ((sp + 1) & 0xFF)]\n"
+                  "high = ram[0x100 | ((sp + 2) & 0xFF)]\n"
+                  "regs.sp = (sp + 2) & 0xFF\n"
+                  "regs.pc = (((high << 8) | low) + 1) & 0xFFFF"),
+    "RTI": (JUMP, "sp = regs.sp\n"
+                  "alu.set_status(ram[0x100 | ((sp + 1) & 0xFF)])\n"
+                  "low = ram[0x100 | ((sp + 2) & 0xFF)]\n"
+                  "high = ram[0x100 | ((sp + 3) & 0xFF)]\n"
+                  "regs.sp = (sp + 3) & 0xFF\n"
+                  "regs.pc = (high << 8) | low"),
+    # The byte after BRK is padding; RTI returns past it
+    "BRK": (JUMP, f"cpu._enter_interrupt((pc + 2) & 0xFFFF, {IRQ_VECTOR:#06x}, "
+                  f"{FLAG_BREAK | FLAG_UNUSED:#04x})"),
+
+    "TAX": (OTHER, _load("regs.x", "regs.a")),
+    "TAY": (OTHER, _load("regs.y", "regs.a")),
+    "TXA": (OTHER, _load("regs.a", "regs.x")),
+    "TYA": (OTHER, _load("regs.a", "regs.y")),
+    "TSX": (OTHER, _load("regs.x", "regs.sp")),
+    "TXS": (OTHER, "regs.sp = regs.x"),
+    "INX": (OTHER, _load("regs.x", "(regs.x + 1) & 0xFF")),
+    "INY": (OTHER, _load("regs.y", "(regs.y + 1) & 0xFF")),
+    "DEX": (OTHER, _load("regs.x", "(regs.x - 1) & 0xFF")),
+    "DEY": (OTHER, _load("regs.y", "(regs.y - 1) & 0xFF")),
+    "PHA": (OTHER, "sp = regs.sp\n"
+                   "memory.store_byte(0x100 | sp, regs.a)\n"
+                   "regs.sp = (sp - 1) & 0xFF"),
+    "PHP": (OTHER, "sp = regs.sp\n"
+                   f"memory.store_byte(0x100 | sp, alu.status() | {FLAG_BREAK | FLAG_UNUSED:#04x})\n"
+                   "regs.sp = (sp - 1) & 0xFF"),
+    "PLA": (OTHER, "sp = (regs.sp + 1) & 0xFF\n"
+                   + _load("regs.a", "ram[0x100 | sp]") + "\n"
+                   "regs.sp = sp"),
+    "PLP": (OTHER, "sp = (regs.sp + 1) & 0xFF\n"
+                   "alu.set_status(ram[0x100 | sp])\n"
+                   "regs.sp = sp"),
+    "CLC": (OTHER, "alu.carry_flag = False"),
+    "SEC": (OTHER, "alu.carry_flag = True"),
+    "CLI": (OTHER, "alu.interrupt_flag = False"),
+    "SEI": (OTHER, "alu.interrupt_flag = True"),
+    "CLV": (OTHER, "alu.overflow_flag = False"),
+    "CLD": (OTHER, "alu.decimal_flag = False"),
+    "SED": (OTHER, "alu.decimal_flag = True"),
+    "NOP": (OTHER, ""),
+}
+
+_factories = {}  # opcode -> factory(cpu) returning the handler
+
+
+def handler_name(opcode):
+    """Return the handler name for *opcode*, e.g. _execute_lda_immediate"""
+    mnemonic, mode = INSTRUCTIONS[opcode]
+    if mode in (IMPLIED, RELATIVE):
+        return f"_execute_{mnemonic.lower()}"
+    return f"_execute_{mnemonic.lower()}_{mode}"
+
+
+def handler_source(opcode):
+    """Return the Python source of the handler factory for *opcode*"""
+    mnemonic, mode = INSTRUCTIONS[opcode]
+    kind, operation = OPERATIONS[mnemonic]
+    lines = ["pc = regs.pc"]
+    if kind == BRANCH:
+        lines += [
+            "next_pc = (pc + 2) & 0xFFFF",
+            f"if {operation}:",
+            "    offset = memory.fetch_byte((pc + 1) & 0xFFFF)",
+            "    target = (next_pc + offset - 0x100 if offset >= 0x80 else next_pc + offset) & 0xFFFF",
+            "    regs.pc = target",
+            "    return 2 if (next_pc ^ target) & 0xFF00 else 1",
+            "regs.pc = next_pc",
+        ]
+    else:
+        if mode == IMMEDIATE:
+            lines.append("value = memory.fetch_byte((pc + 1) & 0xFFFF)")
+        elif mode == ACCUMULATOR:
+            lines.append("value = regs.a")
+        elif mode != IMPLIED:
+            lines += ADDRESS_MODES[mode].split("\n")
+            if kind in (READ, MODIFY):
+                lines.append("value = memory.fetch_byte(address)")
+        if operation:
+            lines += operation.split("\n")
+        if kind == MODIFY:
+            lines.append("regs.a = result" if mode == ACCUMULATOR
+                         else "memory.store_byte(address, result)")
+        if kind != JUMP:
+            lines.append(f"regs.pc = (pc + {1 + OPERAND_SIZES[mode]}) & 0xFFFF")
+        if opcode in PAGE_PENALTY:
+            lines += ["if (base ^ address) & 0xFF00:", "    return 1"]
+    name = handler_name(opcode)
+    mode_text = "" if mode == IMPLIED else " " + mode.replace("_", " ")
+    body = "".join(f"        {line}\n" for line in lines)
+    return (f"def factory(cpu):\n"
+            f"    regs = cpu.registers\n"
+            f"    memory = cpu.memory\n"
+            f"    alu = cpu.alu\n"
+            f"    ram = memory._data\n"
+            f"    def {name}():\n"
+            f"        \"\"\"{mnemonic}{mode_text} (generated)\"\"\"\n"
+            f"{body}"
+            f"    return {name}\n")
+
+
+def make_handler(cpu, opcode):
+    """Return the handler for *opcode*, bound to *cpu*.
+
+    The source is compiled once per opcode and shared; each CPU gets its
+    own closure over its registers, memory and ALU.
+    """
+    factory = _factories.get(opcode)
+    if factory is None:
+        namespace = {}
+        exec(compile(handler_source(opcode), f"<{handler_name(opcode)}>", "exec"), namespace)
+        factory = _factories[opcode] = namespace["factory"]
+    return factory(cpu)
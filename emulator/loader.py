@@ -0,0 +1,73 @@
+from emulator.memory import MemoryAccessError
+
+
+class HexFormatError(ValueError):
+    """Raised for malformed Intel HEX input"""
+    pass
+
+
+def load_binary(memory, path, address=0x0000):
+    """Copy the raw image at *path* into *memory* at *address*.
+
+    Returns the number of bytes loaded.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    memory.load(address, data)
+    return len(data)
+
+
+def parse_intel_hex(text):
+    """Parse Intel HEX *text* into a list of (address, bytes) segments.
+
+    Supports data, end-of-file, extended segment and extended linear
+    address records.  Adjacent data records are merged into one segment.
+    """
+    segments = []
+    base = 0
+    for number, line in enumerate(text.splitlines(), start=1):
+        line = line.strip()
+        if not line:
+            continue
+        if not line.startswith(":"):
+            raise HexFormatError(f"Line {number}: missing ':' start code")
+        try:
+            record = bytes.fromhex(line[1:])
+        except ValueError:
+            raise HexFormatError(f"Line {number}: invalid hex digits") from None
+        if len(record) < 5 or len(record) != record[0] + 5:
+            raise HexFormatError(f"Line {number}: bad record length")
+        if sum(record) & 0xFF:
+            raise HexFormatError(f"Line {number}: checksum mismatch")
+        length, offset, kind = record[0], (record[1] << 8) | record[2], record[3]
+        payload = record[4:4 + length]
+        if kind == 0x00:
+            address = base + offset
+            if segments and segments[-1][0] + len(segments[-1][1]) == address:
+                segments[-1][1].extend(payload)
+            else:
+                segments.append((address, bytearray(payload)))
+        elif kind == 0x01:
+            break
+        elif kind == 0x02:
+            base = int.from_bytes(payload, "big") << 4
+        elif kind == 0x04:
+            base = int.from_bytes(payload, "big") << 16
+        elif kind not in (0x03, 0x05):  # Start addresses carry no data
+            raise HexFormatError(f"Line {number}: unknown record type {kind:02X}")
+    return [(address, bytes(data)) for address, data in segments]
+
+
+def load_intel_hex(memory, path):
+    """Load the Intel HEX file at *path* into *memory*.
+
+    Returns the (address, length) of every segment loaded.
+    """
+    with open(path) as f:
+        segments = parse_intel_hex(f.read())
+    for address, data in segments:
+        if address + len(data) > memory.size():
+            raise MemoryAccessError(f"Segment at {address:#x} does not fit in memory")
+    for address, data in segments:
+        memory.load(address, data)
+    return [(address, len(data)) for address, data in segments]
@@ -1,8 +1,59 @@
+import mmap
+import os
+from array import array
+
+
+PAGE_SHIFT = 8
+PAGE_SIZE = 1 << PAGE_SHIFT
+
+# Per-page flags that send a write down the slow path
+PAGE_SUBSCRIBED = 0x01
+PAGE_PROTECTED = 0x02
+PAGE_DEVICE = 0x04  # Set by Bus for pages with mapped devices
+PAGE_WATCHED = 0x08  # Has write watchpoints
+
+
 class Memory:
-    """Flat RAM with explicit bounds checking."""
+    """Flat RAM with explicit bounds checking.
+
+    Every write bumps a generation counter for its 256-byte page, so
+    caches of decoded code can tell cheaply whether a page has changed.
+    """
 
     def __init__(self, size: int = 0x10000):
-        self._data = bytearray(size)
+        self._attach(bytearray(size))
+
+    @classmethod
+    def from_file(cls, path, writable: bool = False, size: int = 0x10000) -> "Memory":
+        """Back memory with an mmap of the first *size* bytes of *path*.
+
+        The image is attached without copying.  By default the mapping is
+        copy-on-write: writes stay private to this process and the file,
+        like any pages other processes map from it, is left untouched.
+        With *writable* the writes go straight through to the file.
+        """
+        with open(path, "r+b" if writable else "rb") as f:
+            if os.fstat(f.fileno()).st_size < size:
+                raise ValueError(f"{path} is smaller than {size:#x} bytes")
+            access = mmap.ACCESS_WRITE if writable else mmap.ACCESS_COPY
+            data = mmap.mmap(f.fileno(), size, access=access)
+        memory = cls.__new__(cls)
+        memory._attach(data)
+        return memory
+
+    def _attach(self, data) -> None:
+        """Use the buffer *data* (a bytearray or mmap) as the address space"""
+        self._data = data
+        pages = (len(data) + PAGE_SIZE - 1) >> PAGE_SHIFT
+        self._page_generations = array("L", [0]) * pages
+        self._page_flags = bytearray(pages)
+        self._page_read_watched = bytearray(pages)  # Only read by wrapped readers
+        self._page_subscribers = {}
+        self._protected = []  # (start, end) ranges that reject writes
+        self._watches = []  # (start, end, read, write, callback)
+        # Pages of the last snapshot/restore and the generations they match
+        self._base_pages = None
+        self._base_generations = None
 
     def _check_address(self, address: int) -> None:
         """Validate that *addr* lies within the allocated range."""
@@ -12,17 +63,272 @@ class Memory:
     def write_byte(self, address: int, value: int) -> None:
         """Store the low 8-bits of *value* at *address*"""
         self._check_address(address)
-        self._data[address] = value & 0xFF
+        page = address >> PAGE_SHIFT
+        if self._page_flags[page]:
+            self._write_flagged(page, address, value & 0xFF)
+        else:
+            self._data[address] = value & 0xFF
+            self._page_generations[page] += 1
 
     def read_byte(self, address: int) -> int:
         """Read and return the byte at *address*"""
         self._check_address(address)
         return self._data[address]
 
+    def read_word(self, address: int) -> int:
+        """Read the little-endian 16-bit word at *address*"""
+        self._check_address(address)
+        self._check_address(address + 1)
+        return self._data[address] | (self._data[address + 1] << 8)
+
+    def fetch_byte(self, address: int) -> int:
+        """Read the byte at *address* without bounds checking.
+
+        Only for trusted callers that guarantee *address* is in range, such
+        as the CPU fetching through its 16-bit PC from 64 KiB of RAM.
+        """
+        return self._data[address]
+
+    def fetch_word(self, address: int) -> int:
+        """Read a little-endian word without bounds checking.
+
+        The high byte wraps at the top of the 64 KiB address space.
+        """
+        data = self._data
+        return data[address] | (data[(address + 1) & 0xFFFF] << 8)
+
+    def store_byte(self, address: int, value: int) -> None:
+        """Store an 8-bit *value* without bounds checking or masking"""
+        page = address >> PAGE_SHIFT
+        if self._page_flags[page]:
+            self._write_flagged(page, address, value)
+        else:
+            self._data[address] = value
+            self._page_generations[page] += 1
+
+    def load(self, address: int, data) -> None:
+        """Copy the bytes-like *data* to *address* in one slice assignment.
+
+        The whole range is bounds-checked once; writing over a protected
+        region raises ReadOnlyMemoryError before anything is copied.
+        """
+        view = memoryview(data).cast("B")
+        end = address + len(view)
+        if not view:
+            return
+        self._check_address(address)
+        self._check_address(end - 1)
+        first_page = address >> PAGE_SHIFT
+        last_page = (end - 1) >> PAGE_SHIFT
+        flags = self._page_flags
+        if any(flags[page] & PAGE_PROTECTED for page in range(first_page, last_page + 1)):
+            for start, stop in self._protected:
+                if start < end and address < stop:
+                    raise ReadOnlyMemoryError(
+                        f"Range {address:#06x}-{end - 1:#06x} overlaps read-only memory")
+        self._data[address:end] = view
+        for page in range(first_page, last_page + 1):
+            self._page_generations[page] += 1
+            if flags[page] & PAGE_SUBSCRIBED:
+                start = max(address, page << PAGE_SHIFT)
+                stop = min(end, (page + 1) << PAGE_SHIFT)
+                for written in range(start, stop):
+                    for callback in self._page_subscribers[page]:
+                        callback(written)
+
+    def dump(self, address: int, length: int) -> bytes:
+        """Return a copy of *length* bytes starting at *address*"""
+        if length <= 0:
+            return b""
+        self._check_address(address)
+        self._check_address(address + length - 1)
+        return bytes(self._data[address:address + length])
+
+    def page_generation(self, page: int) -> int:
+        """Return the write generation of *page*"""
+        return self._page_generations[page]
+
+    def page_changed_since(self, page: int, generation: int) -> bool:
+        """Return True if *page* has been written since *generation*"""
+        return self._page_generations[page] != generation
+
+    def subscribe(self, page: int, callback) -> None:
+        """Call *callback(address)* after every write into *page*"""
+        self._page_subscribers.setdefault(page, []).append(callback)
+        self._page_flags[page] |= PAGE_SUBSCRIBED
+
+    def unsubscribe(self, page: int, callback) -> None:
+        """Stop calling *callback* for writes into *page*"""
+        subscribers = self._page_subscribers.get(page, [])
+        if callback in subscribers:
+            subscribers.remove(callback)
+        if not subscribers:
+            self._page_subscribers.pop(page, None)
+            self._page_flags[page] &= ~PAGE_SUBSCRIBED
+
+    def protect(self, start: int, end: int) -> None:
+        """Make addresses *start* up to (not including) *end* read-only"""
+        self._check_address(start)
+        self._check_address(end - 1)
+        self._protected.append((start, end))
+        for page in range(start >> PAGE_SHIFT, ((end - 1) >> PAGE_SHIFT) + 1):
+            self._page_flags[page] |= PAGE_PROTECTED
+
+    def is_protected(self, address: int) -> bool:
+        """Return True if *address* lies in a read-only region"""
+        if not self._page_flags[address >> PAGE_SHIFT] & PAGE_PROTECTED:
+            return False
+        return any(start <= address < end for start, end in self._protected)
+
+    def watch(self, start: int, end: int, callback, read: bool = False, write: bool = True) -> None:
+        """Call *callback(kind, address, value)* on accesses to *start*..*end*.
+
+        *kind* is "read" or "write".  Write watchpoints fire after the
+        byte is stored.  Read watchpoints see every read through the
+        fetch/read accessors, instruction fetches included.  Pages with
+        no watchpoint keep the plain access path, and while no read
+        watchpoint exists at all the readers are not wrapped.
+        """
+        self._check_address(start)
+        self._check_address(end - 1)
+        self._watches.append((start, end, read, write, callback))
+        self._update_watch_flags()
+
+    def unwatch(self, start: int, end: int, callback) -> None:
+        """Remove the watchpoints on *start*..*end* that call *callback*"""
+        self._watches = [watch for watch in self._watches
+                         if watch[:2] != (start, end) or watch[4] != callback]
+        self._update_watch_flags()
+
+    def _update_watch_flags(self) -> None:
+        flags = self._page_flags
+        read_watched = self._page_read_watched
+        for page in range(len(flags)):
+            flags[page] &= ~PAGE_WATCHED
+            read_watched[page] = 0
+        for start, end, read, write, _ in self._watches:
+            for page in range(start >> PAGE_SHIFT, ((end - 1) >> PAGE_SHIFT) + 1):
+                if read:
+                    read_watched[page] = 1
+                if write:
+                    flags[page] |= PAGE_WATCHED
+        # Swap the readers on this instance only while something watches reads
+        readers = ("read_byte", "fetch_byte", "read_word", "fetch_word")
+        if any(watch[2] for watch in self._watches):
+            for name in readers:
+                setattr(self, name, getattr(self, "_watched_" + name))
+        else:
+            for name in readers:
+                self.__dict__.pop(name, None)
+
+    def _notify_watches(self, kind: str, address: int, value: int) -> None:
+        write = kind == "write"
+        for start, end, read, watches_write, callback in self._watches:
+            if start <= address < end and (watches_write if write else read):
+                callback(kind, address, value)
+
+    def _watched_read_byte(self, address: int) -> int:
+        value = type(self).read_byte(self, address)
+        if self._page_read_watched[address >> PAGE_SHIFT]:
+            self._notify_watches("read", address, value)
+        return value
+
+    def _watched_fetch_byte(self, address: int) -> int:
+        value = type(self).fetch_byte(self, address)
+        if self._page_read_watched[address >> PAGE_SHIFT]:
+            self._notify_watches("read", address, value)
+        return value
+
+    def _watched_read_word(self, address: int) -> int:
+        return self.read_byte(address) | (self.read_byte(address + 1) << 8)
+
+    def _watched_fetch_word(self, address: int) -> int:
+        return self.fetch_byte(address) | (self.fetch_byte((address + 1) & 0xFFFF) << 8)
+
+    def _write_flagged(self, page: int, address: int, value: int) -> None:
+        """Write into a page that is protected, watched or has subscribers"""
+        flags = self._page_flags[page]
+        if flags & PAGE_PROTECTED and self.is_protected(address):
+            raise ReadOnlyMemoryError(f"Address {address:#06x} is read-only")
+        self._data[address] = value
+        self._page_generations[page] += 1
+        if flags & PAGE_SUBSCRIBED:
+            for callback in self._page_subscribers[page]:
+                callback(address)
+        if flags & PAGE_WATCHED:
+            self._notify_watches("write", address, value)
+
+    def snapshot(self) -> tuple:
+        """Capture memory as a tuple of immutable 256-byte pages.
+
+        Pages not written since the previous snapshot or restore are shared
+        with it rather than copied, so snapshotting mostly unchanged memory
+        only costs the dirty pages.
+        """
+        data = self._data
+        generations = self._page_generations
+        base_pages = self._base_pages
+        base_generations = self._base_generations
+        pages = []
+        for page in range(len(generations)):
+            if base_pages is not None and generations[page] == base_generations[page]:
+                pages.append(base_pages[page])
+            else:
+                start = page << PAGE_SHIFT
+                pages.append(bytes(data[start:start + PAGE_SIZE]))
+        pages = tuple(pages)
+        self._base_pages = pages
+        self._base_generations = array("L", generations)
+        return pages
+
+    def restore(self, pages: tuple) -> None:
+        """Bring memory back to a tuple of pages from snapshot().
+
+        Only pages that actually differ are copied.  Copied pages bump
+        their generation and notify subscribers like ordinary writes, but
+        bypass write protection.
+        """
+        generations = self._page_generations
+        if len(pages) != len(generations):
+            raise ValueError("Snapshot does not match this memory's size")
+        data = self._data
+        base_pages = self._base_pages
+        base_generations = self._base_generations
+        for page, contents in enumerate(pages):
+            if (base_pages is not None and base_pages[page] is contents
+                    and generations[page] == base_generations[page]):
+                continue
+            start = page << PAGE_SHIFT
+            end = start + len(contents)
+            if data[start:end] == contents:
+                continue
+            data[start:end] = contents
+            generations[page] += 1
+            if self._page_flags[page] & PAGE_SUBSCRIBED:
+                for address in range(start, end):
+                    for callback in self._page_subscribers[page]:
+                        callback(address)
+        self._base_pages = pages
+        self._base_generations = array("L", generations)
+
     def size(self):
         """Return the size of the memory in bytes"""
         return len(self._data)
 
+    def flush(self) -> None:
+        """Write a file-backed memory's changes through to its file"""
+        if isinstance(self._data, mmap.mmap):
+            self._data.flush()
+
+    def close(self) -> None:
+        """Release a file-backed mapping; the memory is unusable afterwards"""
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+
 class MemoryAccessError(RuntimeError):
     """Raised when an address is outside the allocated RAM"""
-    pass
\ No newline at end of file
+    pass
+
+class ReadOnlyMemoryError(MemoryAccessError):
+    """Raised when writing into a protected (read-only) region"""
+    pass
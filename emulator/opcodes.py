@@ -0,0 +1,159 @@
+"""Instruction-set tables shared by the interpreter and the translator."""
+
+BRK_OPCODE = 0x00
+
+# Addressing modes, and the operand bytes each one takes
+IMPLIED = "implied"
+ACCUMULATOR = "accumulator"
+IMMEDIATE = "immediate"
+ZERO_PAGE = "zero_page"
+ZERO_PAGE_X = "zero_page_x"
+ZERO_PAGE_Y = "zero_page_y"
+ABSOLUTE = "absolute"
+ABSOLUTE_X = "absolute_x"
+ABSOLUTE_Y = "absolute_y"
+INDIRECT = "indirect"                  # ($nnnn), JMP only
+INDEXED_INDIRECT = "indexed_indirect"  # ($nn,X)
+INDIRECT_INDEXED = "indirect_indexed"  # ($nn),Y
+RELATIVE = "relative"
+
+OPERAND_SIZES = {
+    IMPLIED: 0, ACCUMULATOR: 0, IMMEDIATE: 1, RELATIVE: 1,
+    ZERO_PAGE: 1, ZERO_PAGE_X: 1, ZERO_PAGE_Y: 1,
+    INDEXED_INDIRECT: 1, INDIRECT_INDEXED: 1,
+    ABSOLUTE: 2, ABSOLUTE_X: 2, ABSOLUTE_Y: 2, INDIRECT: 2,
+}
+
+# The instruction set, one mnemonic per line: each entry is
+# mode:opcode/cycles, with a trailing + when crossing a page on the
+# indexed read costs one more cycle.  INSTRUCTIONS, CYCLES and
+# PAGE_PENALTY below are derived from it, and from them the dispatch
+# table, the assembler and the disassembler; emulator.handlers holds
+# the operation each mnemonic performs.
+SPEC = """
+ADC imm:69/2 zp:65/3 zpx:75/4 abs:6D/4 absx:7D/4+ absy:79/4+ indx:61/6 indy:71/5+
+AND imm:29/2 zp:25/3 zpx:35/4 abs:2D/4 absx:3D/4+ absy:39/4+ indx:21/6 indy:31/5+
+ASL acc:0A/2 zp:06/5 zpx:16/6 abs:0E/6 absx:1E/7
+BCC rel:90/2
+BCS rel:B0/2
+BEQ rel:F0/2
+BIT zp:24/3 abs:2C/4
+BMI rel:30/2
+BNE rel:D0/2
+BPL rel:10/2
+BRK imp:00/7
+BVC rel:50/2
+BVS rel:70/2
+CLC imp:18/2
+CLD imp:D8/2
+CLI imp:58/2
+CLV imp:B8/2
+CMP imm:C9/2 zp:C5/3 zpx:D5/4 abs:CD/4 absx:DD/4+ absy:D9/4+ indx:C1/6 indy:D1/5+
+CPX imm:E0/2 zp:E4/3 abs:EC/4
+CPY imm:C0/2 zp:C4/3 abs:CC/4
+DEC zp:C6/5 zpx:D6/6 abs:CE/6 absx:DE/7
+DEX imp:CA/2
+DEY imp:88/2
+EOR imm:49/2 zp:45/3 zpx:55/4 abs:4D/4 absx:5D/4+ absy:59/4+ indx:41/6 indy:51/5+
+INC zp:E6/5 zpx:F6/6 abs:EE/6 absx:FE/7
+INX imp:E8/2
+INY imp:C8/2
+JMP abs:4C/3 ind:6C/5
+JSR abs:20/6
+LDA imm:A9/2 zp:A5/3 zpx:B5/4 abs:AD/4 absx:BD/4+ absy:B9/4+ indx:A1/6 indy:B1/5+
+LDX imm:A2/2 zp:A6/3 zpy:B6/4 abs:AE/4 absy:BE/4+
+LDY imm:A0/2 zp:A4/3 zpx:B4/4 abs:AC/4 absx:BC/4+
+LSR acc:4A/2 zp:46/5 zpx:56/6 abs:4E/6 absx:5E/7
+NOP imp:EA/2
+ORA imm:09/2 zp:05/3 zpx:15/4 abs:0D/4 absx:1D/4+ absy:19/4+ indx:01/6 indy:11/5+
+PHA imp:48/3
+PHP imp:08/3
+PLA imp:68/4
+PLP imp:28/4
+ROL acc:2A/2 zp:26/5 zpx:36/6 abs:2E/6 absx:3E/7
+ROR acc:6A/2 zp:66/5 zpx:76/6 abs:6E/6 absx:7E/7
+RTI imp:40/6
+RTS imp:60/6
+SBC imm:E9/2 zp:E5/3 zpx:F5/4 abs:ED/4 absx:FD/4+ absy:F9/4+ indx:E1/6 indy:F1/5+
+SEC imp:38/2
+SED imp:F8/2
+SEI imp:78/2
+STA zp:85/3 zpx:95/4 abs:8D/4 absx:9D/5 absy:99/5 indx:81/6 indy:91/6
+STX zp:86/3 zpy:96/4 abs:8E/4
+STY zp:84/3 zpx:94/4 abs:8C/4
+TAX imp:AA/2
+TAY imp:A8/2
+TSX imp:BA/2
+TXA imp:8A/2
+TXS imp:9A/2
+TYA imp:98/2
+"""
+
+_MODE_NAMES = {
+    "imp": IMPLIED, "acc": ACCUMULATOR, "imm": IMMEDIATE, "rel": RELATIVE,
+    "zp": ZERO_PAGE, "zpx": ZERO_PAGE_X, "zpy": ZERO_PAGE_Y,
+    "abs": ABSOLUTE, "absx": ABSOLUTE_X, "absy": ABSOLUTE_Y,
+    "ind": INDIRECT, "indx": INDEXED_INDIRECT, "indy": INDIRECT_INDEXED,
+}
+
+# opcode -> (mnemonic, mode) and base cycles for every documented opcode,
+# and the opcodes whose indexed read pays a page-crossing cycle
+INSTRUCTIONS = {}
+CYCLES = [0] * 256
+PAGE_PENALTY = set()
+for _line in SPEC.strip().splitlines():
+    _mnemonic, *_entries = _line.split()
+    for _entry in _entries:
+        _mode, _code = _entry.split(":")
+        _opcode, _cycles = _code.split("/")
+        _opcode = int(_opcode, 16)
+        INSTRUCTIONS[_opcode] = (_mnemonic, _MODE_NAMES[_mode])
+        CYCLES[_opcode] = int(_cycles.rstrip("+"))
+        if _cycles.endswith("+"):
+            PAGE_PENALTY.add(_opcode)
+
+# Straight-line templates: opcode -> (length, Python source).  {b} is the
+# byte operand and {w} the word operand.  Sources work on the locals a, x
+# and y, keep the pending ALU result in r (only its carry bit, 0x100, is
+# read on entry) and leave the overflow bit, when they set it, in v.
+TEMPLATES = {
+    0xA9: (2, "a = {b}\nr = a | (r & 0x100)"),    # LDA #immediate
+    0xA2: (2, "x = {b}\nr = x | (r & 0x100)"),    # LDX #immediate
+    0xA0: (2, "y = {b}\nr = y | (r & 0x100)"),    # LDY #immediate
+    0x8D: (3, "store({w}, a)"),        # STA absolute
+    0x8E: (3, "store({w}, x)"),        # STX absolute
+    0x8C: (3, "store({w}, y)"),        # STY absolute
+    0xAA: (1, "x = a\nr = x | (r & 0x100)"),      # TAX
+    0xA8: (1, "y = a\nr = y | (r & 0x100)"),      # TAY
+    0x8A: (1, "a = x\nr = a | (r & 0x100)"),      # TXA
+    0x98: (1, "a = y\nr = a | (r & 0x100)"),      # TYA
+    0xE8: (1, "x = (x + 1) & 0xFF\nr = x | (r & 0x100)"),  # INX
+    0xC8: (1, "y = (y + 1) & 0xFF\nr = y | (r & 0x100)"),  # INY
+    0xCA: (1, "x = (x - 1) & 0xFF\nr = x | (r & 0x100)"),  # DEX
+    0x88: (1, "y = (y - 1) & 0xFF\nr = y | (r & 0x100)"),  # DEY
+    # ADC and SBC, as ALU.adc() and ALU.sbc()
+    0x69: (2, "s = a + {b}\nv = (a ^ s) & ({b} ^ s) & 0x80\nr = s\na = s & 0xFF"),
+    0xE9: (2, "s = a - {b}\nv = (a ^ {b}) & (a ^ s) & 0x80\nr = s\na = s & 0xFF"),
+    0xEA: (1, ""),                     # NOP
+}
+
+# Block terminators: BNE and BEQ branch on the zero flag, JMP always jumps
+BRANCHES = {0xD0: False, 0xF0: True}
+JMP_ABSOLUTE = 0x4C
+
+STORES = (0x8D, 0x8E, 0x8C)
+
+# Interrupt vectors, and what taking an IRQ or NMI costs
+NMI_VECTOR = 0xFFFA
+RESET_VECTOR = 0xFFFC
+IRQ_VECTOR = 0xFFFE
+INTERRUPT_CYCLES = 7
+
+
+def branch_penalty(next_pc, target):
+    """Extra cycles for a taken branch from *next_pc* to *target*.
+
+    A taken branch costs one more cycle than CYCLES lists, and one more
+    again when it lands on a different page than the next instruction.
+    """
+    return 2 if (next_pc ^ target) & 0xFF00 else 1
@@ -0,0 +1,86 @@
+import json
+from array import array
+
+
+class Profiler:
+    """Per-opcode counts, a per-PC hit histogram and sampled handler timings.
+
+    Attach one as ``cpu.profiler`` and CPU.run() switches to a profiling
+    loop; with no profiler attached, run() is unchanged.  With
+    *sample_every* set to N, every Nth instruction is timed with
+    perf_counter_ns.
+    """
+
+    def __init__(self, sample_every=0):
+        self.sample_every = sample_every
+        self.reset()
+
+    def reset(self):
+        """Clear every counter"""
+        self.opcode_counts = array("L", [0]) * 256
+        self.pc_hits = array("L", [0]) * 0x10000
+        self.opcode_time_ns = array("Q", [0]) * 256
+        self.opcode_samples = array("L", [0]) * 256
+
+    def total(self):
+        """Return the number of instructions profiled"""
+        return sum(self.opcode_counts)
+
+    def hot_opcodes(self, count=10):
+        """Return the *count* most executed opcodes as (opcode, executions)"""
+        ranked = sorted(range(256), key=self.opcode_counts.__getitem__, reverse=True)
+        return [(opcode, self.opcode_counts[opcode]) for opcode in ranked[:count]
+                if self.opcode_counts[opcode]]
+
+    def hot_addresses(self, count=10):
+        """Return the *count* most executed addresses as (pc, hits)"""
+        hits = self.pc_hits
+        ranked = sorted((pc for pc in range(0x10000) if hits[pc]), key=hits.__getitem__, reverse=True)
+        return [(pc, hits[pc]) for pc in ranked[:count]]
+
+    def mean_time_ns(self, opcode):
+        """Return the sampled mean handler time for *opcode*, or None"""
+        samples = self.opcode_samples[opcode]
+        return self.opcode_time_ns[opcode] / samples if samples else None
+
+    def to_dict(self, opcode_table=None):
+        """Return the profile as plain data, naming handlers from *opcode_table*"""
+        opcodes = {}
+        for opcode in range(256):
+            executions = self.opcode_counts[opcode]
+            if not executions:
+                continue
+            entry = {"count": executions, "mean_ns": self.mean_time_ns(opcode)}
+            if opcode_table is not None and opcode in opcode_table:
+                entry["handler"] = opcode_table[opcode].__name__
+            opcodes[f"{opcode:02X}"] = entry
+        hits = self.pc_hits
+        addresses = {f"{pc:04X}": hits[pc] for pc in range(0x10000) if hits[pc]}
+        return {"total": self.total(), "opcodes": opcodes, "addresses": addresses}
+
+    def to_json(self, opcode_table=None):
+        """Return the profile as a JSON string"""
+        return json.dumps(self.to_dict(opcode_table), indent=2)
+
+    def report(self, opcode_table=None, count=10, disassembler=None):
+        """Return a human readable summary of the hottest opcodes and addresses.
+
+        With an emulator.disassembler.Disassembler, each hot address is
+        shown with the instruction it holds.
+        """
+        total = self.total() or 1
+        lines = [f"{self.total()} instructions", "", "opcode  count      share  mean ns  handler"]
+        for opcode, executions in self.hot_opcodes(count):
+            mean = self.mean_time_ns(opcode)
+            mean_text = f"{mean:7.0f}" if mean is not None else "      -"
+            handler = ""
+            if opcode_table is not None and opcode in opcode_table:
+                handler = opcode_table[opcode].__name__
+            lines.append(f"  {opcode:02X}    {executions:<9}  {executions / total:5.1%}  {mean_text}  {handler}")
+        lines += ["", "address  hits"]
+        for pc, hits in self.hot_addresses(count):
+            if disassembler is None:
+                lines.append(f"  {pc:04X}   {hits}")
+            else:
+                lines.append(f"  {pc:04X}   {hits:<9}  {disassembler.decode(pc)}")
+        return "\n".join(lines)
@@ -21,4 +21,38 @@ class Register16:
         return self._value
 
     def set(self, value):
-        self._value = value & 0xFFFF
\ No newline at end of file
+        self._value = value & 0xFFFF
+
+
+class RegisterFile:
+    """All CPU registers as plain slotted attributes.
+
+    The CPU hot path reads and writes these directly, so callers are
+    responsible for keeping a, x, y and sp within 8 bits and pc within 16.
+    """
+    __slots__ = ("a", "x", "y", "sp", "pc")
+
+    def __init__(self):
+        self.a = 0
+        self.x = 0
+        self.y = 0
+        self.sp = 0
+        self.pc = 0
+
+
+class RegisterView:
+    """A Register8/Register16-compatible view onto one RegisterFile slot"""
+    __slots__ = ("_registers", "_name", "_mask")
+
+    def __init__(self, registers, name, mask=0xFF):
+        self._registers = registers
+        self._name = name
+        self._mask = mask
+
+    def get(self):
+        """Get the current value of the register"""
+        return getattr(self._registers, self._name)
+
+    def set(self, value):
+        """Set the value of the register to *value*"""
+        setattr(self._registers, self._name, value & self._mask)
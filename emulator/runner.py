@@ -0,0 +1,96 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from emulator.cpu import CPU
+from emulator.memory import Memory, MemoryAccessError
+
+
+class Job:
+    """One program run: image, where it starts, how long, and what to collect.
+
+    With *image_path* the job starts from a copy-on-write mapping of that
+    64 KiB file, so workers share one preloaded image instead of each
+    loading it; *program* is then loaded on top.
+    """
+    __slots__ = ("program", "load_address", "start_pc", "max_steps", "collect", "image_path")
+
+    def __init__(self, program=b"", load_address=0x0000, start_pc=None, max_steps=None,
+                 collect=(), image_path=None):
+        self.program = bytes(program)
+        self.load_address = load_address
+        self.start_pc = load_address if start_pc is None else start_pc
+        self.max_steps = max_steps
+        self.collect = tuple(collect)  # (start, length) memory ranges
+        self.image_path = image_path
+
+
+class JobResult:
+    """Final machine state of one Job, tagged with its index in the batch"""
+    __slots__ = ("index", "steps", "cycles", "a", "x", "y", "sp", "pc",
+                 "zero_flag", "negative_flag", "carry_flag", "memory", "error")
+
+    def __init__(self, index, steps, cpu, memory, error=None):
+        regs = cpu.registers
+        self.index = index
+        self.steps = steps
+        self.cycles = cpu.cycles
+        self.a = regs.a
+        self.x = regs.x
+        self.y = regs.y
+        self.sp = regs.sp
+        self.pc = regs.pc
+        self.zero_flag = cpu.alu.zero_flag
+        self.negative_flag = cpu.alu.negative_flag
+        self.carry_flag = cpu.alu.carry_flag
+        self.memory = memory  # One bytes object per collected range
+        self.error = error
+
+
+def run_job(job, index=0):
+    """Run *job* on a fresh CPU and return its JobResult.
+
+    Unknown opcodes and memory errors end the job and are reported in
+    JobResult.error instead of being raised.
+    """
+    memory = Memory.from_file(job.image_path) if job.image_path else None
+    cpu = CPU(memory=memory)
+    cpu.memory.load(job.load_address, job.program)
+    cpu.program_counter.set(job.start_pc)
+    steps = 0
+    error = None
+    try:
+        steps = cpu.run(max_steps=job.max_steps)
+    except (NotImplementedError, MemoryAccessError) as exc:
+        error = f"{type(exc).__name__}: {exc}"
+    collected = [cpu.memory.dump(start, length) for start, length in job.collect]
+    cpu.memory.close()
+    return JobResult(index, steps, cpu, collected, error)
+
+
+def _run_chunk(first_index, jobs):
+    return [run_job(job, first_index + offset) for offset, job in enumerate(jobs)]
+
+
+def run_many(jobs, workers=None, chunksize=None):
+    """Run *jobs* across a process pool, yielding JobResults as they finish.
+
+    Jobs are sent in chunks of *chunksize* to amortise the IPC cost; by
+    default each worker gets about four chunks.  Results arrive in
+    completion order, so use JobResult.index to match them to their jobs.
+    With ``workers=0`` everything runs in this process.
+    """
+    jobs = list(jobs)
+    if workers == 0:
+        for index, job in enumerate(jobs):
+            yield run_job(job, index)
+        return
+    workers = workers or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, -(-len(jobs) // (workers * 4)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_run_chunk, start, jobs[start:start + chunksize])
+            for start in range(0, len(jobs), chunksize)
+        ]
+        for future in as_completed(futures):
+            yield from future.result()
@@ -0,0 +1,96 @@
+import struct
+
+from emulator.alu import FLAG_CARRY, FLAG_ZERO, STORED_FLAGS
+
+# One record: PC, opcode, A, X, Y and the raw flag word from flag_word()
+RECORD = struct.Struct("<HBBBBH")
+HEADER = struct.Struct("<4sIQI")
+MAGIC = b"S8T2"
+
+# Set in a flag word that holds a whole status byte rather than a pending
+# ALU result
+CONCRETE = 0x200
+
+
+def flag_word(alu):
+    """Pack *alu*'s flags into 16 bits without deriving the status byte.
+
+    A pending result keeps its low nine bits, with the stored I/D/V bits
+    shifted above them; concrete flags are kept as the status byte with
+    CONCRETE set.  status_from_word() turns either back into a status
+    byte, so recording leaves that work to whoever reads the trace.
+    """
+    result = alu._result
+    if result is None:
+        return CONCRETE | alu.status()
+    return (result & 0x1FF) | (alu._stored << 9)
+
+
+def status_from_word(word):
+    """Return the status byte for a flag word recorded by flag_word()"""
+    if word & CONCRETE:
+        return word & 0xFF
+    return ((word & 0x80)
+            | (0 if word & 0xFF else FLAG_ZERO)
+            | (FLAG_CARRY if word & 0x100 else 0)
+            | ((word >> 9) & STORED_FLAGS))
+
+
+class TraceRecorder:
+    """Fixed-size ring buffer holding the last *capacity* executed instructions.
+
+    Attach one as ``cpu.tracer`` and CPU.run() records each instruction
+    just before it executes.  Records are packed into a preallocated
+    bytearray, so recording allocates nothing per step.  Flags are stored
+    raw, as flag_word() packs them, and decoded by records().
+    """
+
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self.buffer = bytearray(capacity * RECORD.size)
+        self.cursor = 0  # Byte offset of the next record to write
+        self.count = 0   # Records written since the last clear()
+
+    def clear(self):
+        """Forget every record"""
+        self.cursor = 0
+        self.count = 0
+
+    def record(self, pc, opcode, a, x, y, flags):
+        """Append one record, overwriting the oldest when full.
+
+        *flags* is a flag word from flag_word().
+        """
+        RECORD.pack_into(self.buffer, self.cursor, pc, opcode, a, x, y, flags)
+        self.cursor = (self.cursor + RECORD.size) % len(self.buffer)
+        self.count += 1
+
+    def records(self):
+        """Return the stored records, oldest first, as (pc, opcode, a, x, y, flags)"""
+        size = min(self.count, self.capacity) * RECORD.size
+        start = (self.cursor - size) % len(self.buffer)
+        if start + size <= len(self.buffer):
+            ordered = self.buffer[start:start + size]
+        else:
+            ordered = self.buffer[start:] + self.buffer[:self.cursor]
+        return [(pc, opcode, a, x, y, status_from_word(flags))
+                for pc, opcode, a, x, y, flags in RECORD.iter_unpack(bytes(ordered))]
+
+    def dump(self, path):
+        """Write the ring buffer to *path* for offline decoding with load()"""
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, self.capacity, self.count, self.cursor))
+            f.write(self.buffer)
+
+    @classmethod
+    def load(cls, path):
+        """Read a trace written by dump()"""
+        with open(path, "rb") as f:
+            magic, capacity, count, cursor = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a trace file")
+            recorder = cls(capacity)
+            f.readinto(recorder.buffer)
+        recorder.count = count
+        recorder.cursor = cursor
+        return recorder
@@ -0,0 +1,208 @@
+from emulator.memory import PAGE_SHIFT
+from emulator.opcodes import BRANCHES, BRK_OPCODE, JMP_ABSOLUTE, STORES, TEMPLATES, branch_penalty
+
+NO_LIMIT = float("inf")
+
+MAX_BLOCK_INSTRUCTIONS = 64
+
+
+class Block:
+    """A translated run of guest instructions starting at *start*"""
+    __slots__ = ("start", "end", "length", "run", "source")
+
+    def __init__(self, start, end, length, run, source):
+        self.start = start
+        self.end = end  # One past the last byte of the block
+        self.length = length  # Instructions executed per call
+        self.run = run
+        self.source = source
+
+
+def compile_block(cpu, start, max_instructions=MAX_BLOCK_INSTRUCTIONS):
+    """Compile the guest code at *start* into a Block, or return None.
+
+    The block ends after the first BNE, BEQ or JMP, before the first
+    opcode without a template, or after *max_instructions*.  Calling the
+    compiled function returns the cycles the block used.
+    """
+    fetch_byte = cpu.memory.fetch_byte
+    cycle_table = cpu.cycle_table
+    lines = []
+    pc = start
+    length = 0
+    cycles = 0
+    result_pending = False
+    overflow_pending = False
+    exit_lines = None
+    store_targets = []
+    while length < max_instructions:
+        opcode = fetch_byte(pc)
+        b = fetch_byte((pc + 1) & 0xFFFF)
+        w = b | (fetch_byte((pc + 2) & 0xFFFF) << 8)
+        if opcode in BRANCHES:
+            offset = b - 0x100 if b >= 0x80 else b
+            fallthrough = (pc + 2) & 0xFFFF
+            target = (fallthrough + offset) & 0xFFFF
+            if result_pending:
+                test = "(r & 0xFF) == 0" if BRANCHES[opcode] else "(r & 0xFF) != 0"
+            else:
+                test = "alu.zero_flag" if BRANCHES[opcode] else "not alu.zero_flag"
+            cycles += cycle_table[opcode]
+            taken_cycles = cycles + branch_penalty(fallthrough, target)
+            exit_lines = [
+                f"if {test}:",
+                f"    regs.pc = {target}",
+                f"    return {taken_cycles}",
+                f"regs.pc = {fallthrough}",
+                f"return {cycles}",
+            ]
+            pc = fallthrough
+            length += 1
+            break
+        if opcode == JMP_ABSOLUTE:
+            cycles += cycle_table[opcode]
+            exit_lines = [f"regs.pc = {w}", f"return {cycles}"]
+            pc = (pc + 3) & 0xFFFF
+            length += 1
+            break
+        template = TEMPLATES.get(opcode)
+        if template is None:
+            break
+        size, source = template
+        if opcode in STORES:
+            # The store may raise (ReadOnlyMemoryError, a device), so leave
+            # the machine as the interpreter would just before this opcode
+            lines += ["regs.a = a", "regs.x = x", "regs.y = y", f"regs.pc = {pc}"]
+            if result_pending:
+                lines.append("alu._result = r")
+            if overflow_pending:
+                lines.append("alu.overflow_flag = v")
+        if source:
+            lines.extend(source.format(b=b, w=w).split("\n"))
+        result_pending = result_pending or "r = " in source
+        overflow_pending = overflow_pending or "v = " in source
+        cycles += cycle_table[opcode]
+        if opcode in STORES:
+            store_targets.append((w, len(lines), length + 1, (pc + size) & 0xFFFF, cycles))
+        pc = (pc + size) & 0xFFFF
+        length += 1
+    if length == 0:
+        return None
+    if pc <= start:
+        return None  # Wrapped past 0xFFFF; leave it to the interpreter
+
+    # A store into the block itself ends the block right after it, so the
+    # rest of this call never runs bytes that have just been patched
+    for target, line_count, executed, next_pc, used in store_targets:
+        if start <= target < pc:
+            lines = lines[:line_count]
+            length = executed
+            pc = next_pc
+            cycles = used
+            exit_lines = None
+            result_pending = any("r = " in line for line in lines)
+            overflow_pending = any("v = " in line for line in lines)
+            break
+    if exit_lines is None:
+        exit_lines = [f"regs.pc = {pc}", f"return {cycles}"]
+
+    body = ["a = regs.a", "x = regs.x", "y = regs.y"]
+    if result_pending:
+        body.append("r = 0x100 if alu.carry_flag else 0")  # Templates read only the carry
+    body += lines
+    if result_pending:
+        body.append("alu._result = r")
+    if overflow_pending:
+        body.append("alu.overflow_flag = v")
+    body += ["regs.a = a", "regs.x = x", "regs.y = y"] + exit_lines
+    source = "def block():\n" + "".join(f"    {line}\n" for line in body)
+
+    namespace = {
+        "regs": cpu.registers,
+        "alu": cpu.alu,
+        "store": cpu.memory.store_byte,
+    }
+    exec(compile(source, f"<block {start:#06x}>", "exec"), namespace)
+    return Block(start, pc, length, namespace["block"], source)
+
+
+class BlockTranslator:
+    """Translate guest code into cached Python functions, one per basic block.
+
+    A block runs from its start address up to and including the next
+    BNE, BEQ or JMP.  It also ends before any opcode without a template.
+    Blocks are cached by start address.  The translator subscribes to
+    every page holding translated code and drops a block as soon as memory
+    inside it is written.
+    """
+
+    def __init__(self, cpu):
+        self.cpu = cpu
+        self._blocks = {}
+        self._code_map = bytearray(0x10000)  # Number of blocks covering each byte
+        self._code_pages = set()
+
+    def run(self, max_steps=None, until_pc=None, max_cycles=None):
+        """Execute like CPU.run(), a whole block per call where possible.
+
+        Instructions that cannot be translated, and blocks that would
+        overrun *max_steps* or contain *until_pc*, fall back to CPU.step().
+        The cycle budget is checked between blocks.  Returns the number of
+        instructions executed.
+        """
+        cpu = self.cpu
+        regs = cpu.registers
+        fetch_byte = cpu.memory.fetch_byte
+        step = cpu.step
+        blocks = self._blocks
+        translate = self.translate
+        cycle_limit = NO_LIMIT if max_cycles is None else cpu.cycles + max_cycles
+        interrupts = cpu._interrupts
+        halt_opcode = BRK_OPCODE if cpu.halt_on_brk else None
+        steps = 0
+        while steps != max_steps and cpu.cycles < cycle_limit:
+            if interrupts:
+                cpu.cycles += cpu._service_interrupts()  # Between blocks only
+            pc = regs.pc
+            if pc == until_pc:
+                break
+            block = blocks.get(pc)
+            if block is None:
+                block = translate(pc)
+            if (block is not None
+                    and (max_steps is None or max_steps - steps >= block.length)
+                    and not (until_pc is not None and block.start < until_pc < block.end)):
+                cpu.cycles += block.run()
+                steps += block.length
+                continue
+            if fetch_byte(pc) == halt_opcode:
+                break
+            step()
+            steps += 1
+        return steps
+
+    def translate(self, start):
+        """Translate and cache the block at *start*, or return None"""
+        block = compile_block(self.cpu, start)
+        if block is None:
+            return None
+        self._blocks[start] = block
+        for address in range(start, block.end):
+            self._code_map[address] += 1
+        for page in range(start >> PAGE_SHIFT, ((block.end - 1) >> PAGE_SHIFT) + 1):
+            if page not in self._code_pages:
+                self._code_pages.add(page)
+                self.cpu.memory.subscribe(page, self._on_write)
+        return block
+
+    def invalidate(self, address):
+        """Drop every cached block that covers *address*"""
+        for start, block in list(self._blocks.items()):
+            if block.start <= address < block.end:
+                del self._blocks[start]
+                for covered in range(block.start, block.end):
+                    self._code_map[covered] -= 1
+
+    def _on_write(self, address):
+        if self._code_map[address]:
+            self.invalidate(address)
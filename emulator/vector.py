@@ -0,0 +1,141 @@
+import numpy as np
+
+from emulator.opcodes import BRANCHES, BRK_OPCODE, JMP_ABSOLUTE, TEMPLATES
+
+
+def _compile_operation(source):
+    """Compile a template into op(a, x, y, r, v, b, w, store) -> (a, x, y, r, v).
+
+    The templates are plain Python on the names a, x, y, r, v, b and w, so
+    they run unchanged on NumPy arrays holding one element per machine.
+    """
+    body = source.format(b="b", w="w").split("\n") if source else ["pass"]
+    code = "def op(a, x, y, r, v, b, w, store):\n"
+    code += "".join(f"    {line}\n" for line in body)
+    code += "    return a, x, y, r, v\n"
+    namespace = {}
+    exec(compile(code, "<vector op>", "exec"), namespace)
+    return namespace["op"]
+
+
+# opcode -> (length, compiled operation, whether it leaves an ALU result,
+# whether it sets overflow)
+OPERATIONS = {
+    opcode: (size, _compile_operation(source), "r = " in source, "v = " in source)
+    for opcode, (size, source) in TEMPLATES.items()
+}
+
+
+class VectorCPU:
+    """*count* independent machines stepped in lockstep with NumPy.
+
+    Registers, PCs, pending ALU results and memories are arrays with one
+    row per machine.  Each step groups the active machines by opcode and
+    applies the shared templates from emulator.opcodes to every group at
+    once.  Machines stop on BRK (halted) or on an opcode without a
+    template (faulted) and drop out of the active mask.
+    """
+
+    def __init__(self, count):
+        self.count = count
+        self.a = np.zeros(count, np.uint8)
+        self.x = np.zeros(count, np.uint8)
+        self.y = np.zeros(count, np.uint8)
+        self.sp = np.full(count, 0xFF, np.uint8)
+        self.pc = np.zeros(count, np.uint16)
+        # Unmasked ALU result per machine, as ALU._result; 1 leaves every flag clear
+        self.result = np.ones(count, np.int32)
+        self.overflow = np.zeros(count, np.int32)  # Nonzero while V is set
+        self.memory = np.zeros((count, 0x10000), np.uint8)
+        self.halted = np.zeros(count, bool)
+        self.faulted = np.zeros(count, bool)
+
+    @property
+    def active(self):
+        """Mask of machines that are still running"""
+        return ~(self.halted | self.faulted)
+
+    @property
+    def zero_flag(self):
+        return (self.result & 0xFF) == 0
+
+    @property
+    def negative_flag(self):
+        return (self.result & 0x80) != 0
+
+    @property
+    def carry_flag(self):
+        return (self.result >> 8) != 0
+
+    @property
+    def overflow_flag(self):
+        return self.overflow != 0
+
+    def load(self, address, data, machine=None):
+        """Copy *data* to *address* in one machine, or in all of them"""
+        row = slice(None) if machine is None else machine
+        self.memory[row, address:address + len(data)] = np.frombuffer(bytes(data), np.uint8)
+
+    def step(self):
+        """Execute one instruction on every active machine.
+
+        Returns how many machines executed an instruction.
+        """
+        active = np.flatnonzero(self.active)
+        if not active.size:
+            return 0
+        pcs = self.pc[active].astype(np.int32)
+        opcodes = self.memory[active, pcs]
+        executed = 0
+        for opcode in np.unique(opcodes).tolist():
+            selected = opcodes == opcode
+            group = active[selected]
+            pc = pcs[selected]
+            if opcode == BRK_OPCODE:
+                self.halted[group] = True
+                continue
+            b = self.memory[group, (pc + 1) & 0xFFFF].astype(np.int32)
+            w = b | (self.memory[group, (pc + 2) & 0xFFFF].astype(np.int32) << 8)
+            if opcode in BRANCHES:
+                zero = (self.result[group] & 0xFF) == 0
+                taken = zero if BRANCHES[opcode] else ~zero
+                offset = np.where(b >= 0x80, b - 0x100, b)
+                fallthrough = (pc + 2) & 0xFFFF
+                self.pc[group] = np.where(taken, (fallthrough + offset) & 0xFFFF, fallthrough)
+            elif opcode == JMP_ABSOLUTE:
+                self.pc[group] = w
+            elif opcode in OPERATIONS:
+                size, operation, sets_result, sets_overflow = OPERATIONS[opcode]
+
+                def store(address, value, group=group):
+                    self.memory[group, address] = value
+
+                a, x, y, r, v = operation(
+                    self.a[group].astype(np.int32),
+                    self.x[group].astype(np.int32),
+                    self.y[group].astype(np.int32),
+                    self.result[group],
+                    self.overflow[group],
+                    b, w, store,
+                )
+                self.a[group] = a
+                self.x[group] = x
+                self.y[group] = y
+                if sets_result:
+                    self.result[group] = r
+                if sets_overflow:
+                    self.overflow[group] = v
+                self.pc[group] = (pc + size) & 0xFFFF
+            else:
+                self.faulted[group] = True
+                continue
+            executed += group.size
+        return executed
+
+    def run(self, max_steps=None):
+        """Step until every machine has stopped or *max_steps* lockstep steps ran"""
+        steps = 0
+        while steps != max_steps and self.active.any():
+            self.step()
+            steps += 1
+        return steps
@@ -0,0 +1,37 @@
+import pytest
+
+from emulator.assembler import assemble
+from emulator.cpu import CPU
+
+
+def _countdown(start=0x05):
+    """LDX #start / LOOP: DEX, STX $0200, BNE LOOP / BRK"""
+    return bytes([0xA2, start, 0xCA, 0x8E, 0x00, 0x02, 0xD0, 0xFA, 0x00])
+
+
+@pytest.fixture
+def countdown():
+    """The countdown loop; countdown(start) returns its bytes"""
+    return _countdown
+
+
+@pytest.fixture
+def make_cpu():
+    """Factory for a CPU with *program*, by default the countdown, at *address*"""
+    def make(program=None, address=0x0000, memory=None):
+        cpu = CPU(memory=memory)
+        cpu.memory.load(address, _countdown() if program is None else program)
+        cpu.program_counter.set(address)
+        return cpu
+    return make
+
+
+@pytest.fixture
+def program_cpu():
+    """Factory for a CPU running *source*, assembled at *origin*"""
+    def make(source, origin=0x0200, memory=None):
+        cpu = CPU(memory=memory)
+        assemble(source, origin=origin).load(cpu.memory)
+        cpu.program_counter.set(origin)
+        return cpu
+    return make
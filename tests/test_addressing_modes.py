@@ -0,0 +1,150 @@
+import pytest
+
+from emulator.assembler import assemble
+from emulator.cpu import CPU
+from emulator.disassembler import Disassembler
+from emulator.handlers import handler_source
+from emulator.memory import Memory
+from emulator.opcodes import INSTRUCTIONS, OPERAND_SIZES
+
+
+def run_program(source, **memory):
+    """Assemble *source* at $0200, poke *memory* (aNNNN=value) and run to BRK"""
+    cpu = CPU()
+    assemble(source, origin=0x0200).load(cpu.memory)
+    cpu.program_counter.set(0x0200)
+    for address, value in memory.items():
+        cpu.memory.write_byte(int(address[1:], 16), value)
+    cpu.run()
+    return cpu
+
+
+def test_zero_page_and_absolute_loads():
+    """Zero page and absolute operands read memory"""
+    cpu = run_program("LDA $10\nLDX $0234\nLDY $11\nBRK", a10=0x42, a0234=0x17, a11=0x99)
+
+    assert (cpu.accumulator.get(), cpu.x_register.get(), cpu.y_register.get()) == (0x42, 0x17, 0x99)
+
+
+def test_zero_page_indexing_wraps_within_zero_page():
+    """zp,X and zp,Y stay on page zero"""
+    cpu = run_program("LDX #$20\nLDY #$01\nLDA $F0,X\nLDX $FF,Y\nBRK", a10=0x5A, a00=0x33)
+
+    assert cpu.accumulator.get() == 0x5A
+    assert cpu.x_register.get() == 0x33
+
+
+def test_indirect_modes():
+    """(zp,X) indexes the pointer; (zp),Y indexes the address it holds"""
+    cpu = run_program("""
+        LDX #$04
+        LDY #$10
+        LDA ($FE,X)     ; Pointer at $02/$03 -> $0300
+        STA ($20),Y     ; Pointer at $20/$21 -> $0400, + Y
+        BRK
+    """, a02=0x00, a03=0x03, a0300=0x77, a20=0x00, a21=0x04)
+
+    assert cpu.accumulator.get() == 0x77
+    assert cpu.memory.read_byte(0x0410) == 0x77
+
+
+def test_stores_and_arithmetic_through_memory():
+    """STA/STX/STY forms and ADC/SBC/CMP memory operands"""
+    cpu = run_program("""
+        LDA #$05
+        ADC $40         ; + 3
+        LDX #$02
+        STA $0300,X
+        STX $50
+        LDY #$01
+        STY $50,X
+        SBC $0300,X     ; 8 - 8
+        BRK
+    """, a40=0x03)
+
+    assert cpu.memory.read_byte(0x0302) == 0x08
+    assert cpu.memory.read_byte(0x0050) == 0x02
+    assert cpu.memory.read_byte(0x0052) == 0x01
+    assert cpu.accumulator.get() == 0x00
+    assert cpu.alu.zero_flag
+
+
+def test_cmp_sets_flags_without_changing_a():
+    """CMP subtracts for the flags only"""
+    cpu = run_program("LDA #$10\nCMP $30\nBRK", a30=0x10)
+
+    assert cpu.accumulator.get() == 0x10
+    assert cpu.alu.zero_flag
+
+    cpu = run_program("LDA #$10\nCMP #$20\nBRK")
+    assert not cpu.alu.zero_flag and cpu.alu.negative_flag
+
+
+def test_jmp_indirect_keeps_the_page_wrap_quirk():
+    """A pointer at $xxFF reads its high byte from $xx00"""
+    cpu = CPU()
+    assemble("JMP ($02FF)").load(cpu.memory)
+    cpu.memory.write_byte(0x02FF, 0x34)
+    cpu.memory.write_byte(0x0200, 0x12)
+    cpu.memory.write_byte(0x0300, 0x56)
+
+    cpu.step()
+
+    assert cpu.program_counter.get() == 0x1234
+    assert cpu.cycles == 5
+
+
+@pytest.mark.parametrize("source, cycles", [
+    ("LDX #$01\nLDA $10FE,X", 2 + 4),
+    ("LDX #$02\nLDA $10FE,X", 2 + 5),   # Crosses into $1100
+    ("LDX #$02\nSTA $10FE,X", 2 + 5),   # Stores always pay
+    ("LDY #$02\nLDA ($10),Y", 2 + 6),   # ($10) holds $00FF
+    ("LDA $10", 3),
+    ("LDA $10,X", 4),
+    ("LDA ($10,X)", 6),
+])
+def test_page_crossing_cycles(source, cycles):
+    """Indexed loads cost a cycle more when the index crosses a page"""
+    cpu = CPU()
+    assemble(source).load(cpu.memory)
+    cpu.memory.write_byte(0x0010, 0xFF)
+
+    cpu.run(max_steps=source.count("\n") + 1)
+
+    assert cpu.cycles == cycles
+
+
+def test_assembler_picks_zero_page_only_when_known():
+    """Known small addresses use zero page; forward references don't"""
+    program = assemble("""
+    PTR = $80
+        LDA PTR
+        LDA PTR,X
+        LDA later
+        LDX PTR,Y
+    later:
+    """)
+
+    assert program.code == bytes([0xA5, 0x80, 0xB5, 0x80, 0xAD, 0x09, 0x00, 0xB6, 0x80])
+
+
+def test_every_opcode_round_trips_through_the_disassembler():
+    """Disassembling any instruction and reassembling it gives the same bytes"""
+    memory = Memory()
+    disassembler = Disassembler(memory)
+    for opcode, (mnemonic, mode) in INSTRUCTIONS.items():
+        encoded = bytes([opcode, 0x02, 0x03][:1 + OPERAND_SIZES[mode]])
+        memory.load(0x1000, encoded)
+        text = str(disassembler.decode(0x1000))
+
+        assert assemble(f".org $1000\n{text}").code == encoded, text
+
+
+def test_generated_handlers_are_straight_line():
+    """Mode fetches are inlined into each handler"""
+    source = handler_source(0x71)  # ADC ($nn),Y
+
+    assert "def _execute_adc_indirect_indexed()" in source
+    assert "alu.adc(regs.a, value)" in source
+    assert CPU().opcode_table[0x71].__name__ == "_execute_adc_indirect_indexed"
+    assert set(CPU().opcode_table) == set(INSTRUCTIONS)
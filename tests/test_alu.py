@@ -1,4 +1,4 @@
-from emulator.alu import ALU
+from emulator.alu import ALU, TableALU, build_tables, load_tables, save_tables
 
 
 def test_alu_add_simple():
@@ -51,4 +51,70 @@ def test_alu_sub_sets_carry_flag_on_borrow():
     assert alu.carry_flag == True
 
     alu.sub(0x0A, 0x05)
-    assert alu.carry_flag == False
\ No newline at end of file
+    assert alu.carry_flag == False
+
+def test_alu_flags_start_clear():
+    """A fresh ALU has no pending result and every flag clear"""
+    alu = ALU()
+    assert alu.zero_flag == False
+    assert alu.negative_flag == False
+    assert alu.carry_flag == False
+
+def test_alu_add_sets_carry_flag():
+    """Carry flag should be set when the sum exceeds 8 bits"""
+    alu = ALU()
+    alu.add(0xFF, 0x01)
+    assert alu.carry_flag == True
+    assert alu.zero_flag == True
+
+    alu.add(0x01, 0x01)
+    assert alu.carry_flag == False
+
+def test_alu_setting_one_flag_keeps_the_others():
+    """Overriding a flag should not disturb the flags derived from the last result"""
+    alu = ALU()
+    alu.sub(0x00, 0x01)  # 0xFF with borrow: N and C set, Z clear
+    alu.zero_flag = True
+    assert alu.zero_flag == True
+    assert alu.negative_flag == True
+    assert alu.carry_flag == True
+
+    alu.add(0x01, 0x01)  # A new result replaces the overrides
+    assert alu.zero_flag == False
+    assert alu.negative_flag == False
+    assert alu.carry_flag == False
+
+def test_alu_lazy_flags_match_eager_definitions():
+    """Lazy flags must equal the eager Z/N/C definitions for every input pair"""
+    alu = ALU()
+    for a in range(0x100):
+        for b in range(0, 0x100, 7):
+            for op, raw in ((alu.add, a + b), (alu.sub, a - b)):
+                result = op(a, b)
+                assert result == raw & 0xFF
+                assert alu.zero_flag == (result == 0)
+                assert alu.negative_flag == ((result & 0x80) != 0)
+                assert alu.carry_flag == (raw > 0xFF or raw < 0)
+
+def test_table_alu_matches_arithmetic_alu_exhaustively():
+    """TableALU must agree with ALU on every one of the 65,536 input pairs"""
+    reference = ALU()
+    table = TableALU()
+    for a in range(0x100):
+        for b in range(0x100):
+            for op in ("add", "sub"):
+                assert getattr(table, op)(a, b) == getattr(reference, op)(a, b)
+                assert table.zero_flag == reference.zero_flag
+                assert table.negative_flag == reference.negative_flag
+                assert table.carry_flag == reference.carry_flag
+
+def test_alu_tables_round_trip_through_file(tmp_path):
+    """Tables saved to disk should load back unchanged"""
+    tables = build_tables()
+    path = tmp_path / "alu.tables"
+    save_tables(path, tables)
+    assert load_tables(path) == tables
+
+    alu = TableALU(load_tables(path))
+    assert alu.add(0xFF, 0x02) == 0x01
+    assert alu.carry_flag == True
@@ -0,0 +1,80 @@
+import pytest
+
+from emulator.assembler import AssemblyError, assemble
+from emulator.cpu import CPU
+from emulator.opcodes import INSTRUCTIONS
+
+def test_assembles_the_hand_encoded_countdown(countdown):
+    """Labels resolve to the same bytes as the hand-worked branch offsets"""
+    program = assemble("""
+            LDX #$05
+    loop:   DEX         ; Decrement X
+            STX $0200
+            BNE loop
+            BRK
+    """)
+
+    assert program.code == countdown()
+    assert program.labels == {"loop": 0x0002}
+
+
+def test_program_loads_and_runs():
+    """A Program copies itself into memory at its origin"""
+    program = assemble("""
+    START = $0300
+            .org START
+            lda #$20
+            adc #$30
+            sta result
+            jmp done
+    done:   brk
+    result: .byte 0
+    """)
+    cpu = CPU()
+    program.load(cpu.memory)
+    cpu.program_counter.set(program.origin)
+
+    assert program.origin == 0x0300
+    assert cpu.run() == 4
+    assert cpu.memory.read_byte(program.labels["result"]) == 0x50
+
+
+def test_directives_and_expressions():
+    """.byte, .word, .org gaps and </> selectors"""
+    program = assemble("""
+    table:  .byte 1, %101, $FF, -1
+            .word table+$1234, end
+            .org $0010
+    end:    .byte <end, >$ABCD
+    """)
+
+    assert program.code == (bytes([1, 5, 0xFF, 0xFF, 0x34, 0x12, 0x10, 0x00])
+                            + bytes(8) + bytes([0x10, 0xAB]))
+
+
+def test_forward_branch():
+    """Branches may target labels defined later"""
+    program = assemble("BEQ skip\nNOP\nskip: BRK")
+
+    assert program.code == bytes([0xF0, 0x01, 0xEA, 0x00])
+
+
+@pytest.mark.parametrize("source, message", [
+    ("FOO #$01", "unknown instruction"),
+    ("STA #$01", "does not take"),
+    ("TAX #1", "does not take"),
+    ("BNE nowhere", "undefined label"),
+    ("LDA #$100", "does not fit"),
+    ("x: NOP\nx: NOP", "already defined"),
+    ("BNE far\n.org $0100\nfar: BRK", "out of range"),
+    (".org $10\nNOP\n.org $08", "moves backwards"),
+])
+def test_errors_name_the_line(source, message):
+    """Bad source raises AssemblyError with its line number"""
+    with pytest.raises(AssemblyError, match=f"Line \\d+: .*{message}"):
+        assemble(source)
+
+
+def test_mnemonics_cover_the_opcode_table():
+    """Every opcode the CPU implements has an assembler mnemonic"""
+    assert set(CPU().opcode_table) == set(INSTRUCTIONS)
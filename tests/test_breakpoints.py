@@ -0,0 +1,93 @@
+from emulator.bus import Bus, ConsolePort
+
+
+def test_breakpoint_stops_before_the_instruction(make_cpu):
+    """run() stops at a breakpoint and resumes past it"""
+    cpu = make_cpu()
+    cpu.add_breakpoint(0x0006)
+
+    assert cpu.run() == 3
+    assert cpu.program_counter.get() == 0x0006
+    assert cpu.hit.kind == "breakpoint" and cpu.hit.pc == 0x0006
+
+    assert cpu.run() == 3  # Steps over the breakpoint, stops on the next pass
+    assert cpu.x_register.get() == 0x03
+
+    cpu.remove_breakpoint(0x0006)
+    assert cpu.run() == 10
+    assert cpu.hit is None
+
+
+def test_conditional_breakpoint(make_cpu):
+    """A condition is evaluated with the CPU each time the PC is reached"""
+    cpu = make_cpu()
+    cpu.add_breakpoint(0x0006, lambda cpu: cpu.x_register.get() == 0x02)
+
+    cpu.run()
+
+    assert cpu.program_counter.get() == 0x0006
+    assert cpu.x_register.get() == 0x02
+
+
+def test_write_watchpoint_stops_after_the_store(make_cpu):
+    """A write watchpoint stops once the writing instruction completes"""
+    cpu = make_cpu()
+    cpu.watch(0x0200)
+
+    assert cpu.run() == 3
+    hit = cpu.hit
+    assert (hit.kind, hit.pc, hit.address, hit.value) == ("write", 0x0003, 0x0200, 0x04)
+    assert cpu.program_counter.get() == 0x0006
+
+    cpu.unwatch(0x0200)
+    cpu.run()
+    assert cpu.hit is None
+    assert cpu.x_register.get() == 0x00
+
+
+def test_read_watchpoint_sees_operand_reads(make_cpu):
+    """Read watchpoints fire on reads through the CPU's accessors"""
+    cpu = make_cpu()
+    cpu.watch(0x0001, read=True, write=False)
+
+    assert cpu.run() == 1
+    assert (cpu.hit.kind, cpu.hit.address, cpu.hit.value) == ("read", 0x0001, 0x05)
+
+
+def test_read_watchpoint_keeps_device_reads_on_a_bus():
+    """Wrapped readers still route device pages to the device"""
+    bus = Bus()
+    bus.map_device(0xF000, 0xF001, ConsolePort())
+    bus.write_byte(0x1234, 0x56)
+    seen = []
+    bus.watch(0x1234, 0x1235, lambda *access: seen.append(access), read=True, write=False)
+
+    assert bus.fetch_word(0x1233) == 0x5600
+    assert bus.read_byte(0xF000) == 0x00
+    assert seen == [("read", 0x1234, 0x56)]
+
+
+def test_debugging_leaves_plain_memory_accessors_alone(make_cpu):
+    """Readers are only wrapped while a read watchpoint exists"""
+    cpu = make_cpu()
+    cpu.watch(0x0200)
+    assert "fetch_byte" not in vars(cpu.memory)
+
+    cpu.watch(0x0300, read=True)
+    assert "fetch_byte" in vars(cpu.memory)
+
+    cpu.unwatch(0x0300)
+    assert "fetch_byte" not in vars(cpu.memory)
+
+
+def test_write_watchpoint_on_a_device_port(program_cpu):
+    """Stores that a device handles still fire write watchpoints"""
+    bus = Bus()
+    console = ConsolePort()
+    bus.map_device(0xF000, 0xF001, console)
+    cpu = program_cpu("LDA #$41\nSTA $F000\nBRK", memory=bus)
+    cpu.watch(0xF000)
+
+    assert cpu.run() == 2
+    assert (cpu.hit.kind, cpu.hit.pc, cpu.hit.address, cpu.hit.value) == ("write", 0x0202, 0xF000, 0x41)
+    assert console.text() == "A"
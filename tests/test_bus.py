@@ -0,0 +1,93 @@
+import pytest
+
+from emulator.bus import Bus, ConsolePort, CycleTimer, Device
+from emulator.cpu import CPU
+from emulator.memory import MemoryAccessError, ReadOnlyMemoryError
+
+
+def test_unmapped_addresses_behave_like_ram():
+    """Without devices a Bus is plain memory"""
+    bus = Bus()
+    bus.write_byte(0x1234, 0xAB)
+    assert bus.read_byte(0x1234) == 0xAB
+    assert bus.fetch_byte(0x1234) == 0xAB
+    with pytest.raises(MemoryAccessError):
+        bus.read_byte(0x10000)
+
+
+def test_console_port_captures_guest_output():
+    """Guest stores to the console port are captured as they happen"""
+    echoed = []
+    console = ConsolePort(echo=echoed.append)
+    bus = Bus()
+    bus.map_device(0xF001, 0xF002, console)
+    cpu = CPU(memory=bus)
+    # LDA #'H' / STA $F001 / LDA #'i' / STA $F001 / BRK
+    bus.load(0x0000, bytes([0xA9, 0x48, 0x8D, 0x01, 0xF0, 0xA9, 0x69, 0x8D, 0x01, 0xF0, 0x00]))
+
+    cpu.run()
+
+    assert console.text() == "Hi"
+    assert echoed == [0x48, 0x69]
+    assert bus.read_byte(0xF001) == 0x00  # Port reads come from the device
+    assert bus.read_byte(0xF000) == 0x00  # Rest of the page is still RAM
+    bus.write_byte(0xF000, 0x12)
+    assert bus.read_byte(0xF000) == 0x12
+
+
+def test_device_sees_offsets_relative_to_its_start():
+    """Devices are addressed by offset into their mapped range"""
+    accesses = []
+
+    class Recorder(Device):
+        def read(self, offset):
+            accesses.append(("read", offset))
+            return 0x7F
+
+        def write(self, offset, value):
+            accesses.append(("write", offset, value))
+
+    bus = Bus()
+    bus.map_device(0xD010, 0xD020, Recorder())
+    bus.write_byte(0xD012, 0x05)
+    assert bus.read_word(0xD01E) == 0x7F7F
+
+    assert accesses == [("write", 2, 0x05), ("read", 14), ("read", 15)]
+
+
+def test_cycle_timer_latches_on_low_byte():
+    """Reading offset 0 latches the count; writes restart it"""
+    now = [1000]
+    timer = CycleTimer(lambda: now[0])
+    bus = Bus()
+    bus.map_device(0xE000, 0xE004, timer)
+
+    now[0] += 0x0102
+    assert bus.read_byte(0xE000) == 0x02
+    now[0] += 0x10000
+    assert bus.read_byte(0xE001) == 0x01  # Still the latched value
+    bus.write_byte(0xE000, 0x00)
+    assert bus.read_byte(0xE000) == 0x00
+
+
+def test_rom_mapping_rejects_writes():
+    """map_rom() loads data and makes it read-only"""
+    bus = Bus()
+    bus.map_rom(0xC000, b"\xEA\xEA")
+    assert bus.read_byte(0xC001) == 0xEA
+    with pytest.raises(ReadOnlyMemoryError):
+        bus.write_byte(0xC000, 0x00)
+
+
+def test_file_backed_bus_maps_devices(tmp_path):
+    """Bus.from_file gives a working bus over the file's image"""
+    path = tmp_path / "image.bin"
+    path.write_bytes(bytes([0x5A]) + bytes(0xFFFF))
+    bus = Bus.from_file(path)
+    console = ConsolePort()
+    bus.map_device(0xF000, 0xF001, console)
+
+    assert bus.read_byte(0x0000) == 0x5A
+    bus.write_byte(0xF000, 0x41)
+    assert console.text() == "A"
+    bus.close()
@@ -1,3 +1,6 @@
+import pytest
+
+from emulator.alu import TableALU
 from emulator.cpu import CPU
 
 
@@ -126,4 +129,43 @@ def test_sub_sets_negative_flag():
     cpu.step()
 
     assert cpu.accumulator.get() == 0xFF
-    assert cpu.alu.negative_flag == True
\ No newline at end of file
+    assert cpu.alu.negative_flag == True
+
+def test_unknown_opcode_raises():
+    """Unused dispatch slots should raise NotImplementedError"""
+    cpu = CPU()
+    cpu.memory.write_byte(0x0000, 0xFF)
+
+    with pytest.raises(NotImplementedError):
+        cpu.step()
+
+
+def test_register_opcode_installs_handler():
+    """New opcodes can be plugged into the dispatch table"""
+    cpu = CPU()
+    calls = []
+
+    def handler():
+        calls.append(cpu.program_counter.get())
+        cpu.program_counter.set(cpu.program_counter.get() + 1)
+
+    cpu.register_opcode(0xFF, handler)
+    cpu.memory.write_byte(0x0000, 0xFF)
+    cpu.step()
+
+    assert calls == [0x0000]
+    assert cpu.opcode_table[0xFF] == handler
+    assert cpu.program_counter.get() == 0x01
+
+
+def test_cpu_accepts_alu_backend():
+    """CPU should run with an alternative ALU backend"""
+    cpu = CPU(alu=TableALU())
+    cpu.accumulator.set(0x05)
+    cpu.memory.write_byte(0x0000, 0xE9)
+    cpu.memory.write_byte(0x0001, 0x05)
+
+    cpu.step()
+
+    assert cpu.accumulator.get() == 0x00
+    assert cpu.alu.zero_flag == True
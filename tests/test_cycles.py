@@ -0,0 +1,66 @@
+from emulator.cpu import CPU
+from emulator.translator import BlockTranslator
+
+# Countdown: LDX(2) + 5 * (DEX(2) + STX(4) + BNE(2)) + 4 taken branches(+1 each)
+COUNTDOWN_CYCLES = 2 + 5 * 8 + 4
+
+
+def test_step_counts_base_cycles(make_cpu):
+    """Each instruction adds its 6502 cycle count"""
+    cpu = make_cpu()
+    cpu.step()  # LDX #$05
+    assert cpu.cycles == 2
+    cpu.step()  # DEX
+    cpu.step()  # STX $0200
+    assert cpu.cycles == 8
+
+
+def test_taken_branch_costs_an_extra_cycle(make_cpu):
+    """BNE costs 2 cycles not taken and 3 when taken on the same page"""
+    cpu = make_cpu()
+    cpu.run()
+    assert cpu.cycles == COUNTDOWN_CYCLES
+
+
+def test_branch_across_a_page_costs_two_extra_cycles(make_cpu):
+    """A taken branch landing on another page costs 4 cycles"""
+    cpu = make_cpu(bytes([0xD0, 0x10]), address=0x00FC)  # BNE +16 from $00FE to $010E
+    cpu.step()
+    assert cpu.program_counter.get() == 0x010E
+    assert cpu.cycles == 4
+
+
+def test_run_stops_at_cycle_budget(make_cpu):
+    """run() halts once this call has used max_cycles"""
+    cpu = make_cpu()
+    steps = cpu.run(max_cycles=10)
+
+    assert steps == 4  # LDX(2) DEX(2) STX(4) = 8 < 10, so BNE(3) still runs
+    assert cpu.cycles == 11
+    assert cpu.run(max_cycles=1) == 1
+    assert cpu.cycles == 13
+
+
+def test_pre_decoded_rom_counts_the_same_cycles(countdown):
+    """Pre-decoded entries report the same cycles as the interpreter"""
+    cpu = CPU()
+    cpu.load_rom(0x0000, countdown())
+    cpu.run()
+    assert cpu.cycles == COUNTDOWN_CYCLES
+
+
+def test_translated_blocks_count_the_same_cycles(make_cpu):
+    """Blocks return their cycles, branch penalties included"""
+    cpu = make_cpu()
+    BlockTranslator(cpu).run()
+    assert cpu.cycles == COUNTDOWN_CYCLES
+
+
+def test_snapshot_restores_cycle_count(make_cpu):
+    """The cycle counter is part of the machine state"""
+    cpu = make_cpu()
+    cpu.step()
+    snap = cpu.snapshot()
+    cpu.run()
+    cpu.restore(snap)
+    assert cpu.cycles == 2
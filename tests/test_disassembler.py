@@ -0,0 +1,106 @@
+from emulator.assembler import assemble
+from emulator.bus import Bus, CycleTimer
+from emulator.cpu import CPU
+from emulator.disassembler import Disassembler
+from emulator.memory import Memory
+from emulator.profiler import Profiler
+from emulator.trace import TraceRecorder
+
+SOURCE = """
+        LDX #$05
+loop:   DEX
+        STX $0200
+        BNE loop
+        JMP $1234
+        BRK
+"""
+
+
+def loaded_memory():
+    memory = Memory()
+    assemble(SOURCE).load(memory)
+    return memory
+
+
+def test_linear_sweep_decodes_every_instruction():
+    """Mnemonics, operands and branch targets are resolved"""
+    disassembler = Disassembler(loaded_memory())
+
+    listing = [str(instruction) for instruction in disassembler.disassemble(0x0000, 0x000C)]
+
+    assert listing == ["LDX #$05", "DEX", "STX $0200", "BNE $0002", "JMP $1234", "BRK"]
+    assert disassembler.decode(0x0006).target == 0x0002
+    assert disassembler.format(0x0003) == "0003  8E 00 02  STX $0200"
+
+
+def test_static_jumps_resolve_their_targets():
+    """JMP and JSR absolute have targets; JMP indirect depends on memory"""
+    memory = Memory()
+    assemble("JSR $1234\nJMP $5678\nJMP ($9ABC)").load(memory)
+    disassembler = Disassembler(memory)
+
+    assert [disassembler.decode(address).target for address in (0x0000, 0x0003, 0x0006)] == [0x1234, 0x5678, None]
+
+
+def test_unknown_opcodes_decode_as_data():
+    """Bytes without a mnemonic become one-byte .byte entries"""
+    memory = Memory()
+    memory.load(0x0000, bytes([0xFF, 0xEA]))
+
+    assert [str(i) for i in Disassembler(memory).disassemble(0, 2)] == [".byte $FF", "NOP"]
+
+
+def test_decodings_are_cached_until_their_page_is_written():
+    """Repeated lookups reuse one Instruction; a write redecodes the page"""
+    memory = loaded_memory()
+    disassembler = Disassembler(memory)
+    first = disassembler.decode(0x0003)
+
+    assert disassembler.decode(0x0003) is first
+
+    memory.write_byte(0x0300, 0x00)  # Another page
+    assert disassembler.decode(0x0003) is first
+
+    memory.write_byte(0x0005, 0x03)
+    assert str(disassembler.decode(0x0003)) == "STX $0300"
+
+
+def test_instruction_across_a_page_boundary_sees_writes():
+    """Straddling instructions are redecoded every time"""
+    memory = Memory()
+    memory.load(0x00FE, bytes([0xEA, 0x8D, 0x00, 0x02]))
+    disassembler = Disassembler(memory)
+    assert str(disassembler.decode(0x00FF)) == "STA $0200"
+
+    memory.write_byte(0x0101, 0x04)
+
+    assert str(disassembler.decode(0x00FF)) == "STA $0400"
+
+
+def test_trace_and_profile_rendering():
+    """Trace records and hot addresses are shown as instructions"""
+    cpu = CPU(memory=loaded_memory())
+    cpu.tracer = TraceRecorder(2)
+    cpu.profiler = Profiler()
+    cpu.run(until_pc=0x0008)
+    disassembler = Disassembler(cpu.memory)
+
+    assert disassembler.format_trace(cpu.tracer.records()) == [
+        "0003  STX $0200     A=00 X=00 Y=00 P=02",
+        "0006  BNE $0002     A=00 X=00 Y=00 P=02",
+    ]
+    assert "0002   5          DEX" in cpu.profiler.report(disassembler=disassembler)
+
+
+def test_decoding_has_no_side_effects():
+    """Listing code reads RAM directly: no device reads, no read watchpoints"""
+    bus = Bus()
+    timer = CycleTimer(lambda: 7)
+    bus.map_device(0x0000, 0x0004, timer)
+    seen = []
+    bus.watch(0x0000, 0x0004, lambda *access: seen.append(access), read=True, write=False)
+
+    Disassembler(bus).format(0x0000)
+
+    assert timer._latched == 0
+    assert seen == []
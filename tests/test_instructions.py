@@ -0,0 +1,214 @@
+import pytest
+
+from emulator.alu import FLAG_CARRY, FLAG_DECIMAL, FLAG_INTERRUPT, FLAG_OVERFLOW
+from emulator.assembler import assemble
+from emulator.cpu import CPU
+from emulator.disassembler import Disassembler
+from emulator.opcodes import CYCLES, INSTRUCTIONS, PAGE_PENALTY, SPEC
+
+
+def test_spec_covers_the_documented_instruction_set():
+    """151 opcodes from 56 mnemonics, with cycles and penalties from SPEC"""
+    assert len(INSTRUCTIONS) == 151
+    assert len({mnemonic for mnemonic, _ in INSTRUCTIONS.values()}) == 56
+    assert CYCLES[0x7D] == 4 and 0x7D in PAGE_PENALTY  # ADC $nnnn,X
+    assert CYCLES[0x9D] == 5 and 0x9D not in PAGE_PENALTY  # STA $nnnn,X
+    assert CYCLES[0xFE] == 7  # INC $nnnn,X
+    assert all(CYCLES[opcode] for opcode in INSTRUCTIONS)
+    assert "ROR" in SPEC
+
+
+@pytest.mark.parametrize("source, a", [
+    ("LDA #$F0\nAND #$3C", 0x30),
+    ("LDA #$F0\nORA #$0F", 0xFF),
+    ("LDA #$FF\nEOR #$0F", 0xF0),
+])
+def test_logic_operations_keep_carry(source, a, program_cpu):
+    """AND/ORA/EOR set zero and negative from A and leave carry alone"""
+    cpu = program_cpu("SEC\n" + source + "\nBRK")
+    cpu.run()
+
+    assert cpu.accumulator.get() == a
+    assert cpu.alu.carry_flag
+    assert cpu.alu.negative_flag == bool(a & 0x80)
+    assert not cpu.alu.zero_flag
+
+
+def test_shifts_and_rotates_of_the_accumulator(program_cpu):
+    """ASL/LSR shift in zero; ROL/ROR shift the old carry in"""
+    cpu = program_cpu("""
+            LDA #$81
+            ASL A
+            STA $10     ; $02, carry set
+            ROL
+            STA $11     ; $05, carry clear
+            LSR A
+            STA $12     ; $02, carry set
+            ROR A
+            STA $13     ; $81, carry clear
+            BRK
+    """)
+    cpu.run()
+
+    assert bytes(cpu.memory.read_byte(0x10 + i) for i in range(4)) == bytes([0x02, 0x05, 0x02, 0x81])
+    assert not cpu.alu.carry_flag
+    assert cpu.alu.negative_flag
+
+
+def test_read_modify_write_on_memory(program_cpu):
+    """INC/DEC/ASL/ROR update memory in place and cost their spec cycles"""
+    cpu = program_cpu("""
+            LDX #$01
+            INC $10
+            DEC $11,X
+            ASL $0300
+            ROR $02FF,X
+            BRK
+    """)
+    cpu.memory.write_byte(0x0010, 0xFF)
+    cpu.memory.write_byte(0x0012, 0x01)
+    cpu.memory.write_byte(0x0300, 0x40)
+    cpu.run()
+
+    assert cpu.memory.read_byte(0x0010) == 0x00
+    assert cpu.memory.read_byte(0x0012) == 0x00
+    assert cpu.memory.read_byte(0x0300) == 0x40  # ASL then ROR with carry clear
+    assert cpu.cycles == 2 + 5 + 6 + 6 + 7
+
+
+def test_compare_sets_carry_when_register_is_not_lower(program_cpu):
+    """CMP/CPX/CPY leave the register alone and set carry when it is >= the operand"""
+    cpu = program_cpu("""
+            LDA #$10
+            LDX #$20
+            LDY #$30
+            CMP #$10
+            BNE fail
+            BCC fail
+            CPX #$21
+            BCS fail
+            BPL fail    ; $20 - $21 is negative
+            CPY #$20
+            BCC fail
+    done:   BRK
+    fail:   BRK
+    """)
+    cpu.run()
+
+    assert cpu.program_counter.get() == 0x0216  # done
+    assert (cpu.accumulator.get(), cpu.x_register.get(), cpu.y_register.get()) == (0x10, 0x20, 0x30)
+
+
+def test_bit_sets_zero_negative_and_overflow(program_cpu):
+    """BIT takes N and V from memory and Z from A & memory"""
+    cpu = program_cpu("LDA #$01\nBIT $10\nBRK")
+    cpu.memory.write_byte(0x0010, 0xC0)
+    cpu.run()
+
+    assert cpu.alu.zero_flag
+    assert cpu.alu.negative_flag
+    assert cpu.alu.overflow_flag
+    assert cpu.accumulator.get() == 0x01
+
+
+@pytest.mark.parametrize("source, zero, negative", [
+    ("LDA #$00", True, False),
+    ("LDX #$80", False, True),
+    ("LDY #$00\nINY", False, False),
+    ("LDX #$00\nDEX", False, True),
+    ("LDA #$80\nTAY", False, True),
+    ("LDA #$00\nPHA\nLDA #$01\nPLA", True, False),
+    ("LDX #$01\nTXS\nTSX", False, False),
+])
+def test_loads_transfers_and_counters_set_zero_and_negative(source, zero, negative, program_cpu):
+    """Like a 6502, these set Z and N from the result and leave carry alone"""
+    cpu = program_cpu("SEC\n" + source + "\nBRK")
+    cpu.run()
+
+    assert (cpu.alu.zero_flag, cpu.alu.negative_flag) == (zero, negative)
+    assert cpu.alu.carry_flag
+
+
+def test_memory_increment_keeps_carry(program_cpu):
+    """INC/DEC on memory set Z and N but not carry"""
+    cpu = program_cpu("CLC\nDEC $10\nBRK")
+    cpu.run()
+
+    assert cpu.memory.read_byte(0x0010) == 0xFF
+    assert cpu.alu.negative_flag
+    assert not cpu.alu.carry_flag
+
+
+@pytest.mark.parametrize("source, a, overflow", [
+    ("LDA #$7F\nADC #$01", 0x80, True),
+    ("LDA #$FF\nADC #$01", 0x00, False),
+    ("LDA #$80\nSBC #$01", 0x7F, True),
+    ("LDA #$01\nSBC #$01", 0x00, False),
+])
+def test_adc_and_sbc_set_overflow(source, a, overflow, program_cpu):
+    """V is set when a signed result does not fit in a byte"""
+    cpu = program_cpu(source + "\nBRK")
+    cpu.run()
+
+    assert cpu.accumulator.get() == a
+    assert cpu.alu.overflow_flag == overflow
+
+
+@pytest.mark.parametrize("source, a", [
+    ("LDA #$05\nSEC\nSBC #$01", 0x04),
+    ("LDA #$10\nCMP #$10\nSBC #$01", 0x0F),
+    ("LDA #$05\nSEC\nADC #$01", 0x06),
+])
+def test_adc_and_sbc_ignore_carry_in(source, a, program_cpu):
+    """Neither takes a carry-in, whichever instruction set carry"""
+    cpu = program_cpu(source + "\nBRK")
+    cpu.run()
+
+    assert cpu.accumulator.get() == a
+
+
+@pytest.mark.parametrize("branch, flags, taken", [
+    ("BPL", "LDA #$01", True), ("BMI", "LDA #$01", False),
+    ("BCC", "CLC", True), ("BCS", "SEC", True),
+    ("BNE", "LDA #$00", False), ("BEQ", "LDA #$00", True),
+    ("BVC", "CLV", True), ("BVS", "CLV", False),
+])
+def test_every_branch(branch, flags, taken, program_cpu):
+    """Each conditional branch tests its own flag"""
+    cpu = program_cpu(f"{flags}\n{branch} skip\nLDY #$01\nskip: BRK")
+    cpu.run()
+
+    assert cpu.y_register.get() == (0x00 if taken else 0x01)
+
+
+def test_flag_instructions(program_cpu):
+    """SEC/SEI/SED set and CLC/CLI/CLD/CLV clear their status bits"""
+    cpu = program_cpu("SEC\nSEI\nSED\nBRK")
+    cpu.run()
+    assert cpu.alu.status() & (FLAG_CARRY | FLAG_INTERRUPT | FLAG_DECIMAL) == FLAG_CARRY | FLAG_INTERRUPT | FLAG_DECIMAL
+
+    cpu.alu.overflow_flag = True
+    assemble("CLC\nCLI\nCLD\nCLV\nBRK", origin=0x0200).load(cpu.memory)
+    cpu.program_counter.set(0x0200)
+    cpu.run()
+    assert cpu.alu.status() & (FLAG_CARRY | FLAG_INTERRUPT | FLAG_DECIMAL | FLAG_OVERFLOW) == 0
+
+
+def test_stack_pointer_transfers(program_cpu):
+    """TSX copies SP to X and TXS copies X back"""
+    cpu = program_cpu("TSX\nSTX $10\nLDX #$80\nTXS\nBRK")
+    cpu.run()
+
+    assert cpu.memory.read_byte(0x0010) == 0xFF
+    assert cpu.stack_pointer.get() == 0x80
+
+
+def test_accumulator_mode_assembles_and_disassembles():
+    """"ASL A" and a bare "ASL" both encode $0A, listed back as "ASL A\""""
+    program = assemble("ASL A\nASL\nROR a\nLSR $10")
+
+    assert program.code == bytes([0x0A, 0x0A, 0x6A, 0x46, 0x10])
+
+    cpu = CPU()
+    program.load(cpu.memory)
+    assert str(Disassembler(cpu.memory).decode(0x0000)) == "ASL A"
@@ -0,0 +1,64 @@
+import pytest
+
+from emulator.cpu import CPU
+from emulator.loader import HexFormatError, load_binary, load_intel_hex, parse_intel_hex
+from emulator.memory import Memory
+
+def hex_record(address, kind, payload):
+    record = bytes([len(payload), address >> 8, address & 0xFF, kind]) + payload
+    checksum = (-sum(record)) & 0xFF
+    return ":" + (record + bytes([checksum])).hex().upper()
+
+
+def test_load_binary_places_image(tmp_path, countdown):
+    """A raw .bin image should land at the requested address"""
+    path = tmp_path / "countdown.bin"
+    program = countdown()
+    path.write_bytes(program)
+    cpu = CPU()
+
+    assert load_binary(cpu.memory, path, 0x0000) == len(program)
+    assert cpu.run() == 16
+    assert cpu.x_register.get() == 0x00
+
+
+def test_parse_intel_hex_merges_adjacent_records(countdown):
+    """Contiguous data records become one segment"""
+    program = countdown()
+    text = "\n".join([
+        hex_record(0x0000, 0x00, program[:4]),
+        hex_record(0x0004, 0x00, program[4:]),
+        hex_record(0x0300, 0x00, b"\x42"),
+        hex_record(0x0000, 0x01, b""),
+    ])
+
+    assert parse_intel_hex(text) == [(0x0000, program), (0x0300, b"\x42")]
+
+
+def test_parse_intel_hex_applies_extended_addresses():
+    """Segment address records offset the following data"""
+    text = "\n".join([
+        hex_record(0x0000, 0x02, b"\x01\x00"),  # Base 0x1000
+        hex_record(0x0010, 0x00, b"\x99"),
+        hex_record(0x0000, 0x01, b""),
+    ])
+    assert parse_intel_hex(text) == [(0x1010, b"\x99")]
+
+
+def test_parse_intel_hex_rejects_bad_checksum():
+    """Corrupted records should raise HexFormatError"""
+    record = hex_record(0x0000, 0x00, b"\x01")
+    corrupted = record[:-2] + ("00" if record[-2:] != "00" else "01")
+    with pytest.raises(HexFormatError):
+        parse_intel_hex(corrupted)
+
+
+def test_load_intel_hex_file(tmp_path, countdown):
+    """Loading a .hex file reports its segments"""
+    path = tmp_path / "countdown.hex"
+    program = countdown()
+    path.write_text(hex_record(0x0200, 0x00, program) + "\n" + hex_record(0, 0x01, b"") + "\n")
+    mem = Memory()
+
+    assert load_intel_hex(mem, path) == [(0x0200, len(program))]
+    assert mem.dump(0x0200, len(program)) == program
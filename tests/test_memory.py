@@ -1,4 +1,4 @@
-from emulator.memory import Memory, MemoryAccessError
+from emulator.memory import Memory, MemoryAccessError, ReadOnlyMemoryError
 import pytest
 
 def test_write_and_read_back():
@@ -55,4 +55,154 @@ def test_memory_rejects_negative_addresses():
     with pytest.raises(MemoryAccessError):
         mem.read_byte(-1)
     with pytest.raises(MemoryAccessError):
-        mem.write_byte(-1, 42)
\ No newline at end of file
+        mem.write_byte(-1, 42)
+
+def test_read_word_is_little_endian():
+    """read_word should combine the low byte and the following high byte"""
+    mem = Memory()
+    mem.write_byte(0x1000, 0x34)
+    mem.write_byte(0x1001, 0x12)
+    assert mem.read_word(0x1000) == 0x1234
+
+def test_read_word_checks_both_bytes():
+    """A word straddling the end of RAM should raise"""
+    mem = Memory(size=0x100)
+    with pytest.raises(MemoryAccessError):
+        mem.read_word(0xFF)
+
+def test_fetch_matches_checked_reads():
+    """The trusted fetch path should see the same bytes as read_byte"""
+    mem = Memory()
+    mem.write_byte(0x0200, 0xCD)
+    mem.write_byte(0x0201, 0xAB)
+    assert mem.fetch_byte(0x0200) == mem.read_byte(0x0200)
+    assert mem.fetch_word(0x0200) == 0xABCD
+
+def test_fetch_word_wraps_at_top_of_address_space():
+    """The high byte of a word at 0xFFFF comes from 0x0000"""
+    mem = Memory()
+    mem.write_byte(0xFFFF, 0x34)
+    mem.write_byte(0x0000, 0x12)
+    assert mem.fetch_word(0xFFFF) == 0x1234
+
+def test_store_byte_writes_without_checks():
+    """store_byte should be visible through the checked API"""
+    mem = Memory()
+    mem.store_byte(0x3000, 0x7F)
+    assert mem.read_byte(0x3000) == 0x7F
+
+def test_writes_bump_the_page_generation():
+    """Each write should advance the generation of its 256-byte page only"""
+    mem = Memory()
+    generation = mem.page_generation(0x12)
+    mem.write_byte(0x1234, 0x01)
+    mem.store_byte(0x12FF, 0x02)
+
+    assert mem.page_generation(0x12) == generation + 2
+    assert mem.page_changed_since(0x12, generation)
+    assert not mem.page_changed_since(0x13, mem.page_generation(0x13))
+
+def test_subscribers_hear_writes_to_their_page():
+    """Subscribers are called for their page and can unsubscribe"""
+    mem = Memory()
+    seen = []
+    mem.subscribe(0x02, seen.append)
+
+    mem.write_byte(0x0210, 0xAA)
+    mem.write_byte(0x0310, 0xBB)  # Different page
+    mem.store_byte(0x02FF, 0xCC)
+    mem.unsubscribe(0x02, seen.append)
+    mem.write_byte(0x0211, 0xDD)
+
+    assert seen == [0x0210, 0x02FF]
+
+def test_protected_region_rejects_writes():
+    """Writes into a protected range raise; neighbours stay writable"""
+    mem = Memory()
+    mem.write_byte(0x8000, 0x11)
+    mem.protect(0x8000, 0x8010)
+
+    with pytest.raises(ReadOnlyMemoryError):
+        mem.write_byte(0x8000, 0x22)
+    with pytest.raises(ReadOnlyMemoryError):
+        mem.store_byte(0x800F, 0x22)
+    mem.write_byte(0x8010, 0x33)
+
+    assert mem.read_byte(0x8000) == 0x11
+    assert mem.read_byte(0x8010) == 0x33
+    assert mem.is_protected(0x8005)
+    assert not mem.is_protected(0x8010)
+
+def test_read_only_error_is_a_memory_access_error():
+    """Callers catching MemoryAccessError also see read-only violations"""
+    assert issubclass(ReadOnlyMemoryError, MemoryAccessError)
+
+def test_load_copies_bytes_and_dump_reads_them_back():
+    """load() and dump() move whole ranges in one call"""
+    mem = Memory()
+    mem.load(0x0400, b"\x01\x02\x03")
+    mem.load(0x0403, bytearray([0x04]))
+
+    assert mem.dump(0x0400, 4) == b"\x01\x02\x03\x04"
+    assert mem.read_byte(0x0402) == 0x03
+
+def test_load_checks_bounds_once_for_the_whole_range():
+    """A load running past the end of RAM raises and writes nothing"""
+    mem = Memory(size=0x100)
+    with pytest.raises(MemoryAccessError):
+        mem.load(0xFE, b"\x01\x02\x03")
+    assert mem.read_byte(0xFE) == 0x00
+    with pytest.raises(MemoryAccessError):
+        mem.dump(0xFF, 2)
+
+def test_load_bumps_generations_and_respects_protection():
+    """Bulk loads are writes: generations advance and ROM is refused"""
+    mem = Memory()
+    mem.load(0x01FF, b"\xAA\xBB")
+    assert mem.page_generation(0x01) == 1
+    assert mem.page_generation(0x02) == 1
+
+    mem.protect(0x8000, 0x8100)
+    with pytest.raises(ReadOnlyMemoryError):
+        mem.load(0x7FFF, b"\x00\x00")
+
+def test_memory_from_file_is_copy_on_write(tmp_path):
+    """A default file mapping sees the image but never changes the file"""
+    path = tmp_path / "image.bin"
+    path.write_bytes(bytes([0x42]) + bytes(0xFFFF))
+    mem = Memory.from_file(path)
+
+    assert mem.size() == 0x10000
+    assert mem.read_byte(0x0000) == 0x42
+    mem.write_byte(0x0000, 0x99)
+    assert mem.read_byte(0x0000) == 0x99
+    mem.close()
+    assert path.read_bytes()[0] == 0x42
+
+def test_writable_file_memory_persists(tmp_path):
+    """A writable mapping writes through to the file"""
+    path = tmp_path / "image.bin"
+    path.write_bytes(bytes(0x10000))
+    mem = Memory.from_file(path, writable=True)
+    mem.write_byte(0x1234, 0xAB)
+    mem.flush()
+    mem.close()
+    assert path.read_bytes()[0x1234] == 0xAB
+
+def test_file_memory_keeps_bounds_checks(tmp_path):
+    """Mapped memory raises MemoryAccessError like RAM does"""
+    path = tmp_path / "image.bin"
+    path.write_bytes(bytes(0x100))
+    mem = Memory.from_file(path, size=0x100)
+    with pytest.raises(MemoryAccessError):
+        mem.read_byte(0x100)
+    with pytest.raises(MemoryAccessError):
+        mem.write_byte(-1, 0)
+    mem.close()
+
+def test_file_memory_requires_a_large_enough_file(tmp_path):
+    """Mapping past the end of the file is refused"""
+    path = tmp_path / "short.bin"
+    path.write_bytes(bytes(0x10))
+    with pytest.raises(ValueError):
+        Memory.from_file(path)
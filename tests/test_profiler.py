@@ -0,0 +1,57 @@
+import json
+
+from emulator.profiler import Profiler
+
+def test_profiler_counts_opcodes_and_addresses(make_cpu):
+    """Every executed instruction is counted by opcode and by PC"""
+    cpu = make_cpu()
+    cpu.profiler = Profiler()
+
+    assert cpu.run() == 16
+
+    profiler = cpu.profiler
+    assert profiler.total() == 16
+    assert profiler.opcode_counts[0xA2] == 1
+    assert profiler.opcode_counts[0xCA] == 5
+    assert profiler.pc_hits[0x0002] == 5
+    assert profiler.pc_hits[0x0008] == 0  # BRK halts without executing
+    assert profiler.hot_addresses(1) == [(0x0002, 5)]
+
+
+def test_profiled_run_matches_plain_run(make_cpu):
+    """Profiling must not change what the program does"""
+    plain = make_cpu()
+    plain.run(max_steps=7)
+    cpu = make_cpu()
+    cpu.profiler = Profiler()
+    cpu.run(max_steps=7)
+
+    assert cpu.x_register.get() == plain.x_register.get()
+    assert cpu.program_counter.get() == plain.program_counter.get()
+
+
+def test_profiler_samples_handler_time(make_cpu):
+    """With sampling on, every Nth instruction is timed"""
+    cpu = make_cpu()
+    cpu.profiler = Profiler(sample_every=1)
+    cpu.run()
+
+    assert cpu.profiler.opcode_samples[0xCA] == 5
+    assert cpu.profiler.mean_time_ns(0xCA) > 0
+    assert cpu.profiler.mean_time_ns(0xE8) is None
+
+
+def test_profiler_exports_json_and_report(make_cpu):
+    """The profile can be exported for tooling and read by humans"""
+    cpu = make_cpu()
+    cpu.profiler = Profiler()
+    cpu.run()
+
+    data = json.loads(cpu.profiler.to_json(cpu.opcode_table))
+    assert data["total"] == 16
+    assert data["opcodes"]["CA"] == {"count": 5, "mean_ns": None, "handler": "_execute_dex"}
+    assert data["addresses"]["0002"] == 5
+
+    report = cpu.profiler.report(cpu.opcode_table)
+    assert "_execute_dex" in report
+    assert "0002" in report
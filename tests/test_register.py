@@ -1,4 +1,6 @@
-from emulator.register import Register8
+import pytest
+
+from emulator.register import Register8, RegisterFile, RegisterView
 
 
 class TestRegister:
@@ -21,4 +23,33 @@ class TestRegister:
         assert register.get() == 0
 
         register.set(0x101)
-        assert register.get() == 1
\ No newline at end of file
+        assert register.get() == 1
+
+class TestRegisterFile:
+    def test_register_file_initializes_to_zero(self):
+        """Every slot of a new register file should start at 0"""
+        registers = RegisterFile()
+        assert (registers.a, registers.x, registers.y, registers.sp, registers.pc) == (0, 0, 0, 0, 0)
+
+    def test_register_file_has_no_instance_dict(self):
+        """Slots keep the register file compact and reject typos"""
+        registers = RegisterFile()
+        with pytest.raises(AttributeError):
+            registers.accumulator = 1
+
+    def test_view_reads_and_writes_the_file(self):
+        """A view should share state with its register file slot"""
+        registers = RegisterFile()
+        view = RegisterView(registers, "x")
+        view.set(0x2C)
+        assert registers.x == 0x2C
+        registers.x = 0x11
+        assert view.get() == 0x11
+
+    def test_view_masks_to_register_width(self):
+        """Views mask like Register8 and Register16 do"""
+        registers = RegisterFile()
+        RegisterView(registers, "a").set(0x101)
+        RegisterView(registers, "pc", 0xFFFF).set(0x10002)
+        assert registers.a == 0x01
+        assert registers.pc == 0x0002
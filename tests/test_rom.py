@@ -0,0 +1,87 @@
+import pytest
+
+from emulator.cpu import CPU
+from emulator.memory import ReadOnlyMemoryError
+
+def test_load_rom_pre_decodes_instructions(countdown):
+    """Each instruction in the ROM gets a (handler, operand, length) entry"""
+    cpu = CPU()
+    cpu.load_rom(0x0000, countdown())
+
+    assert cpu._decoded[0x0000][1:] == (0x05, 2)    # LDX #$05
+    assert cpu._decoded[0x0002][1:] == (None, 1)    # DEX
+    assert cpu._decoded[0x0003][1:] == (0x0200, 3)  # STX $0200
+    assert cpu._decoded[0x0006][1:] == (0xFA, 2)    # BNE
+    assert cpu._decoded[0x0008] is None             # BRK stays interpreted
+
+
+def test_untemplated_instructions_are_stepped_over_whole():
+    """Operand bytes of an interpreted instruction are not decoded as opcodes"""
+    cpu = CPU()
+    cpu.load_rom(0x0000, [0xA5, 0xA9, 0xE8, 0xE8])  # LDA $A9 / INX / INX
+
+    assert cpu._decoded[0x0000] is None  # LDA zero page has no template
+    assert cpu._decoded[0x0001] is None  # $A9 is an operand, not LDA #
+    assert cpu._decoded[0x0002][1:] == (None, 1)
+    assert cpu._decoded[0x0003][1:] == (None, 1)
+
+
+def test_rom_program_runs_like_ram_program(make_cpu, countdown):
+    """Pre-decoded execution should match the interpreter"""
+    ram = make_cpu()
+    expected_steps = ram.run()
+
+    rom = CPU()
+    rom.load_rom(0x0000, countdown())
+
+    assert rom.run() == expected_steps
+    assert rom.x_register.get() == ram.x_register.get()
+    assert rom.program_counter.get() == ram.program_counter.get()
+    assert rom.memory.read_byte(0x0200) == 0x00
+    assert rom.alu.zero_flag == ram.alu.zero_flag
+
+
+def test_rom_can_run_partially_with_budget(countdown):
+    """Step budgets and until_pc behave the same on pre-decoded code"""
+    cpu = CPU()
+    cpu.load_rom(0x0000, countdown())
+
+    assert cpu.run(max_steps=4) == 4
+    assert cpu.x_register.get() == 0x04
+    assert cpu.run(until_pc=0x0006) == 2
+    assert cpu.program_counter.get() == 0x0006
+
+
+def test_guest_store_into_rom_raises():
+    """A guest STA into the protected region should fail loudly"""
+    cpu = CPU()
+    # LDA #$42 / STA $0000 (inside this ROM)
+    cpu.load_rom(0x0000, [0xA9, 0x42, 0x8D, 0x00, 0x00])
+
+    with pytest.raises(ReadOnlyMemoryError):
+        cpu.run()
+    assert cpu.memory.read_byte(0x0000) == 0xA9
+
+
+def test_debugged_run_keeps_pre_decoded_entries(countdown):
+    """A breakpoint elsewhere does not send ROM code back to the interpreter"""
+    plain = CPU()
+    plain.load_rom(0x0000, countdown())
+    plain.run()
+
+    cpu = CPU()
+    cpu.load_rom(0x0000, countdown())
+    run_dex, operand, length = cpu._decoded[0x0002]
+    calls = []
+
+    def counted():
+        calls.append(True)
+        return run_dex()
+
+    cpu._decoded[0x0002] = (counted, operand, length)
+    cpu.add_breakpoint(0x8000)
+    cpu.run()
+
+    assert len(calls) == 5
+    assert cpu.cycles == plain.cycles
+    assert cpu.x_register.get() == 0x00
@@ -0,0 +1,61 @@
+import pytest
+
+from emulator.cpu import CPU
+
+
+def test_run_halts_at_brk(make_cpu):
+    """run() should execute the whole program and stop before BRK"""
+    cpu = make_cpu()
+
+    steps = cpu.run()
+
+    assert steps == 1 + 5 * 3  # LDX + five DEX/STX/BNE iterations
+    assert cpu.x_register.get() == 0x00
+    assert cpu.memory.read_byte(0x0200) == 0x00
+    assert cpu.program_counter.get() == 0x0008  # Parked on BRK
+
+
+def test_run_respects_step_budget(make_cpu):
+    """run() should stop after max_steps instructions"""
+    cpu = make_cpu()
+
+    steps = cpu.run(max_steps=4)
+
+    assert steps == 4
+    assert cpu.x_register.get() == 0x04
+    assert cpu.program_counter.get() == 0x0002  # Branched back to DEX
+
+
+def test_run_stops_at_until_pc(make_cpu):
+    """run() should stop when the PC reaches until_pc"""
+    cpu = make_cpu()
+
+    steps = cpu.run(until_pc=0x0003)
+
+    assert steps == 2  # LDX, DEX
+    assert cpu.program_counter.get() == 0x0003
+
+
+def test_run_matches_step(make_cpu):
+    """run() should leave the CPU in the same state as repeated step() calls"""
+    stepped = make_cpu()
+    for _ in range(16):
+        stepped.step()
+
+    ran = make_cpu()
+    ran.run()
+
+    assert ran.program_counter.get() == stepped.program_counter.get()
+    assert ran.x_register.get() == stepped.x_register.get()
+    assert ran.alu.zero_flag == stepped.alu.zero_flag
+
+
+def test_run_raises_on_unknown_opcode():
+    """Unknown opcodes should raise just like step()"""
+    cpu = CPU()
+    cpu.memory.write_byte(0x0000, 0xEA)  # NOP
+    cpu.memory.write_byte(0x0001, 0xFF)  # Not implemented
+
+    with pytest.raises(NotImplementedError):
+        cpu.run()
+    assert cpu.program_counter.get() == 0x0001
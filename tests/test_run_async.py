@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+# LOOP: INX / JMP LOOP
+FOREVER = bytes([0xE8, 0x4C, 0x00, 0x00])
+
+
+def test_run_async_matches_run(make_cpu):
+    """The async loop should halt at BRK with the same result as run()"""
+    cpu = make_cpu()
+
+    steps = asyncio.run(cpu.run_async(slice_steps=4))
+
+    assert steps == 16
+    assert cpu.x_register.get() == 0x00
+    assert cpu.program_counter.get() == 0x0008
+
+
+def test_run_async_respects_step_budget(make_cpu):
+    """max_steps is honoured even when it is not a multiple of the slice"""
+    cpu = make_cpu(FOREVER)
+
+    assert asyncio.run(cpu.run_async(slice_steps=4, max_steps=10)) == 10
+
+
+def test_machines_share_the_event_loop(make_cpu):
+    """Two machines interleave instead of one starving the other"""
+    order = []
+
+    def recorder(name):
+        async def hook(cpu):
+            order.append(name)
+        return hook
+
+    async def main():
+        first = make_cpu(FOREVER)
+        second = make_cpu(FOREVER)
+        await asyncio.gather(
+            first.run_async(slice_steps=10, max_steps=30, hooks=[recorder("a")]),
+            second.run_async(slice_steps=10, max_steps=30, hooks=[recorder("b")]),
+        )
+
+    asyncio.run(main())
+
+    assert order == ["a", "b", "a", "b", "a", "b"]
+
+
+def test_run_async_times_out(make_cpu):
+    """A runaway program is stopped by the timeout"""
+    cpu = make_cpu(FOREVER)
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(cpu.run_async(slice_steps=100, timeout=0.01))
+
+
+def test_run_async_can_be_cancelled(make_cpu):
+    """Cancelling the task stops the machine at a slice boundary"""
+    cpu = make_cpu(FOREVER)
+
+    async def main():
+        task = asyncio.create_task(cpu.run_async(slice_steps=100))
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert cpu.x_register.get() != 0x00
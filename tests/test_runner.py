@@ -0,0 +1,58 @@
+from emulator.runner import Job, run_job, run_many
+
+
+def test_run_job_reports_final_state(countdown):
+    """A job result should carry registers, flags and collected memory"""
+    result = run_job(Job(countdown(3), collect=[(0x0200, 1)]))
+
+    assert result.error is None
+    assert result.steps == 1 + 3 * 3
+    assert (result.x, result.pc) == (0x00, 0x0008)
+    assert result.zero_flag == True
+    assert result.memory == [b"\x00"]
+
+
+def test_run_job_honours_load_address_start_pc_and_budget(countdown):
+    """Programs can be loaded anywhere and stopped by the step budget"""
+    result = run_job(Job(countdown(5), load_address=0x0400, max_steps=2))
+
+    assert result.steps == 2
+    assert result.x == 0x04
+    assert result.pc == 0x0403
+
+
+def test_run_job_captures_errors():
+    """An unknown opcode ends the job with an error instead of raising"""
+    result = run_job(Job([0xEA, 0xFF]))
+
+    assert result.error.startswith("NotImplementedError")
+    assert result.pc == 0x0001
+
+
+def test_run_many_across_processes_matches_inline(countdown):
+    """Pooled results should match in-process results job for job"""
+    jobs = [Job(countdown(n), collect=[(0x0200, 1)]) for n in range(1, 20)]
+
+    pooled = {result.index: result for result in run_many(jobs, workers=2, chunksize=4)}
+    inline = list(run_many(jobs, workers=0))
+
+    assert sorted(pooled) == list(range(len(jobs)))
+    for expected in inline:
+        result = pooled[expected.index]
+        assert (result.steps, result.x, result.pc) == (expected.steps, expected.x, expected.pc)
+        assert result.memory == expected.memory
+
+
+def test_run_job_starts_from_mapped_image(tmp_path, countdown):
+    """Jobs can share a preloaded image file instead of loading a program"""
+    path = tmp_path / "image.bin"
+    image = bytearray(0x10000)
+    image[0x0300:0x0300 + 9] = bytes(countdown(4))
+    path.write_bytes(image)
+
+    result = run_job(Job(image_path=str(path), start_pc=0x0300, collect=[(0x0200, 1)]))
+
+    assert result.error is None
+    assert result.x == 0x00
+    assert result.memory == [b"\x00"]
+    assert path.read_bytes() == image  # Private copy-on-write mapping
@@ -0,0 +1,87 @@
+from emulator.assembler import assemble
+from emulator.cpu import CPU
+from emulator.memory import Memory
+from emulator.translator import BlockTranslator
+
+def test_restore_returns_to_snapshot_state(make_cpu):
+    """Registers, flags and memory should all come back"""
+    cpu = make_cpu()
+    cpu.run(max_steps=4)
+    snap = cpu.snapshot()
+
+    cpu.run()
+    assert cpu.x_register.get() == 0x00
+    cpu.restore(snap)
+
+    assert cpu.x_register.get() == 0x04
+    assert cpu.program_counter.get() == 0x0002
+    assert cpu.stack_pointer.get() == 0xFF
+    assert cpu.memory.read_byte(0x0200) == 0x04
+    assert cpu.alu.zero_flag == False
+
+
+def test_snapshot_can_be_restored_repeatedly(make_cpu):
+    """Forking from one warm state gives the same result every time"""
+    cpu = make_cpu()
+    cpu.run(max_steps=1)
+    snap = cpu.snapshot()
+    for _ in range(3):
+        cpu.restore(snap)
+        assert cpu.run() == 15
+        assert cpu.memory.read_byte(0x0200) == 0x00
+
+
+def test_snapshots_share_clean_pages():
+    """Only pages written since the last snapshot are copied"""
+    mem = Memory()
+    first = mem.snapshot()
+    mem.write_byte(0x0210, 0x55)
+    second = mem.snapshot()
+
+    assert second[0x02] is not first[0x02]
+    assert second[0x02][0x10] == 0x55
+    assert all(second[page] is first[page] for page in range(0x100) if page != 0x02)
+
+
+def test_restore_skips_pages_that_did_not_change():
+    """Restoring an unchanged machine leaves page generations alone"""
+    mem = Memory()
+    snap = mem.snapshot()
+    mem.write_byte(0x0300, 0x01)
+    before = [mem.page_generation(page) for page in range(0x100)]
+
+    mem.restore(snap)
+
+    assert mem.read_byte(0x0300) == 0x00
+    after = [mem.page_generation(page) for page in range(0x100)]
+    changed = [page for page in range(0x100) if before[page] != after[page]]
+    assert changed == [0x03]
+
+
+def test_restore_invalidates_translated_code(make_cpu):
+    """Restored code pages must not run stale translated blocks"""
+    cpu = make_cpu()
+    snap = cpu.snapshot()
+    translator = BlockTranslator(cpu)
+    cpu.memory.write_byte(0x0002, 0xE8)  # DEX -> INX
+    translator.run(max_steps=3)
+    assert 0x0002 in translator._blocks
+
+    cpu.restore(snap)
+
+    assert 0x0002 not in translator._blocks
+    translator.run()
+    assert cpu.x_register.get() == 0x00
+
+
+def test_restore_redecodes_rom():
+    """Restoring over ROM must not run its stale pre-decoded entries"""
+    cpu = CPU()
+    snap = cpu.snapshot()
+    cpu.load_rom(0x0000, assemble("LDA #$42\nBRK").code)
+
+    cpu.restore(snap)
+    cpu.run()
+
+    assert cpu.accumulator.get() == 0x00
+    assert cpu._decoded[0x0000] is None
@@ -0,0 +1,135 @@
+from emulator.alu import FLAG_BREAK, FLAG_CARRY, FLAG_INTERRUPT, FLAG_UNUSED, FLAG_ZERO
+from emulator.translator import BlockTranslator
+
+
+def set_vector(cpu, vector, address):
+    cpu.memory.write_byte(vector, address & 0xFF)
+    cpu.memory.write_byte(vector + 1, address >> 8)
+
+
+def test_jsr_and_rts(program_cpu):
+    """JSR pushes PC+2 on page 1; RTS returns after the JSR"""
+    cpu = program_cpu("""
+            JSR double
+            JSR double
+            BRK
+    double: ADC $10
+            STA $10
+            RTS
+    """)
+    cpu.memory.write_byte(0x0010, 0x03)
+    cpu.accumulator.set(0x03)
+
+    assert cpu.run(max_steps=1) == 1
+    assert cpu.stack_pointer.get() == 0xFD
+    assert cpu.memory.read_byte(0x01FF) == 0x02
+    assert cpu.memory.read_byte(0x01FE) == 0x02  # $0202: last byte of the JSR
+
+    cpu.run()
+
+    assert cpu.program_counter.get() == 0x0206
+    assert cpu.stack_pointer.get() == 0xFF
+    assert cpu.memory.read_byte(0x0010) == 0x0C
+    assert cpu.cycles == 2 * (6 + 3 + 3 + 6)
+
+
+def test_push_and_pull(program_cpu):
+    """PHA/PLA and PHP/PLP round-trip through the stack"""
+    cpu = program_cpu("""
+        LDA #$11
+        PHA
+        LDA #$00
+        SBC #$01    ; Borrow sets carry and negative
+        PHP
+        LDA #$22
+        ADC #$00    ; Clears carry and negative
+        PLP
+        PLA
+        BRK
+    """)
+    cpu.run()
+
+    assert cpu.accumulator.get() == 0x11
+    assert cpu.alu.carry_flag  # Restored by PLP
+    assert not cpu.alu.negative_flag and not cpu.alu.zero_flag  # Set by PLA from $11
+    assert cpu.memory.read_byte(0x01FE) & (FLAG_BREAK | FLAG_UNUSED) == FLAG_BREAK | FLAG_UNUSED
+    assert cpu.stack_pointer.get() == 0xFF
+
+
+def test_stack_pointer_wraps_within_page_one(program_cpu):
+    """Pushing with SP at $00 wraps to $01FF"""
+    cpu = program_cpu("PHA\nPLA\nBRK")
+    cpu.stack_pointer.set(0x00)
+    cpu.accumulator.set(0x5A)
+
+    cpu.step()
+
+    assert cpu.memory.read_byte(0x0100) == 0x5A
+    assert cpu.stack_pointer.get() == 0xFF
+    cpu.accumulator.set(0x00)
+    cpu.step()
+    assert cpu.accumulator.get() == 0x5A
+
+
+def test_brk_and_rti_when_not_halting(program_cpu):
+    """With halt_on_brk off, BRK enters the IRQ handler and RTI skips its pad byte"""
+    cpu = program_cpu("""
+            BRK
+            .byte $FF       ; Padding byte
+            LDX #$01
+            JMP $0300
+    .org $0280
+    handler: LDY #$07
+            RTI
+    """)
+    set_vector(cpu, 0xFFFE, 0x0280)
+    cpu.halt_on_brk = False
+    cpu.alu.carry_flag = True
+
+    cpu.run(until_pc=0x0300)
+
+    assert (cpu.x_register.get(), cpu.y_register.get()) == (0x01, 0x07)
+    assert cpu.memory.read_byte(0x01FD) == FLAG_CARRY | FLAG_BREAK | FLAG_UNUSED
+    assert cpu.alu.carry_flag and not cpu.alu.interrupt_flag
+    assert cpu.stack_pointer.get() == 0xFF
+
+
+def test_irq_waits_for_the_interrupt_flag(program_cpu):
+    """A masked IRQ stays pending; NMI is taken regardless"""
+    cpu = program_cpu("loop: JMP loop\n.org $0300\nirq: RTI\n.org $0310\nnmi: RTI")
+    set_vector(cpu, 0xFFFE, 0x0300)
+    set_vector(cpu, 0xFFFA, 0x0310)
+    cpu.alu.interrupt_flag = True
+
+    cpu.irq()
+    cpu.run(max_steps=3)
+    assert cpu.program_counter.get() == 0x0200
+
+    cpu.nmi()
+    cpu.run(until_pc=0x0310)  # Taken before the next instruction
+    assert cpu.program_counter.get() == 0x0310
+    assert cpu.memory.read_byte(0x01FD) == FLAG_INTERRUPT | FLAG_UNUSED
+
+    cpu.run(max_steps=1)  # The RTI restores I=1, so the IRQ still waits
+    assert cpu.program_counter.get() == 0x0200
+    assert cpu.alu.interrupt_flag
+
+    cpu.alu.interrupt_flag = False
+    cycles = cpu.cycles
+    cpu.step()
+    assert cpu.cycles - cycles == 7 + 6  # Interrupt entry, then its RTI
+    assert cpu.program_counter.get() == 0x0200
+
+
+def test_translator_takes_interrupts_between_blocks(program_cpu):
+    """BlockTranslator.run() delivers pending interrupts too"""
+    cpu = program_cpu("loop: LDA #$01\nJMP loop\n.org $0300\nLDX #$09\nBRK")
+    set_vector(cpu, 0xFFFA, 0x0300)
+    translator = BlockTranslator(cpu)
+    translator.run(max_steps=4)
+
+    cpu.nmi()
+    translator.run()
+
+    assert cpu.x_register.get() == 0x09
+    assert cpu.alu.status() & FLAG_ZERO == 0
@@ -0,0 +1,95 @@
+import pytest
+
+from emulator.alu import FLAG_CARRY, FLAG_NEGATIVE, FLAG_OVERFLOW, FLAG_ZERO
+from emulator.cpu import CPU
+from emulator.trace import TraceRecorder, flag_word, status_from_word
+
+def test_trace_records_state_before_each_instruction(make_cpu):
+    """Records hold PC, opcode, registers and flags at fetch time"""
+    cpu = make_cpu()
+    cpu.tracer = TraceRecorder(64)
+    cpu.run()
+
+    records = cpu.tracer.records()
+    assert len(records) == 16
+    assert records[0] == (0x0000, 0xA2, 0x00, 0x00, 0x00, 0x00)
+    assert records[1] == (0x0002, 0xCA, 0x00, 0x05, 0x00, 0x00)
+    assert records[-1] == (0x0006, 0xD0, 0x00, 0x00, 0x00, FLAG_ZERO)
+
+
+def test_ring_buffer_keeps_only_the_last_records(make_cpu):
+    """Once full, the oldest records are overwritten"""
+    cpu = make_cpu()
+    cpu.tracer = TraceRecorder(4)
+    cpu.run()
+
+    assert cpu.tracer.count == 16
+    assert [record[0] for record in cpu.tracer.records()] == [0x0006, 0x0002, 0x0003, 0x0006]
+
+
+def test_trace_survives_several_runs(make_cpu):
+    """Recording continues across run() calls"""
+    cpu = make_cpu()
+    cpu.tracer = TraceRecorder(8)
+    cpu.run(max_steps=3)
+    cpu.run(max_steps=3)
+
+    assert [record[0] for record in cpu.tracer.records()] == [0x0000, 0x0002, 0x0003, 0x0006, 0x0002, 0x0003]
+
+
+def test_trace_dumps_and_loads(tmp_path, make_cpu):
+    """A dumped trace decodes offline to the same records"""
+    cpu = make_cpu()
+    cpu.tracer = TraceRecorder(5)
+    cpu.run()
+    path = tmp_path / "run.trace"
+    cpu.tracer.dump(path)
+
+    loaded = TraceRecorder.load(path)
+
+    assert loaded.count == 16
+    assert loaded.records() == cpu.tracer.records()
+
+
+def test_alu_status_packs_flags():
+    """ALU.status() uses the 6502 bit positions"""
+    cpu = CPU()
+    cpu.alu.sub(0x00, 0x01)
+    assert cpu.alu.status() == FLAG_NEGATIVE | FLAG_CARRY
+    cpu.alu.zero_flag = True
+    assert cpu.alu.status() == FLAG_NEGATIVE | FLAG_ZERO | FLAG_CARRY
+
+
+def test_flag_words_decode_to_the_status_byte():
+    """Pending and concrete flags both round-trip through a flag word"""
+    cpu = CPU()
+    cpu.alu.overflow_flag = True
+    for set_flags in (lambda alu: alu.sub(0x00, 0x01), lambda alu: alu.add(0xFF, 0x01),
+                      lambda alu: setattr(alu, "zero_flag", True)):
+        set_flags(cpu.alu)
+        assert status_from_word(flag_word(cpu.alu)) == cpu.alu.status()
+        assert cpu.alu.status() & FLAG_OVERFLOW
+
+
+def test_breakpoints_do_not_change_the_trace(make_cpu):
+    """The traced loop and the instrumented loop record the same thing"""
+    traced = make_cpu()
+    traced.tracer = TraceRecorder(64)
+    traced.run()
+    instrumented = make_cpu()
+    instrumented.tracer = TraceRecorder(64)
+    instrumented.add_breakpoint(0x1000)  # Never reached
+    instrumented.run()
+
+    assert instrumented.tracer.records() == traced.tracer.records()
+
+
+def test_trace_keeps_the_instruction_that_raised(make_cpu):
+    """An unknown opcode is the last record"""
+    cpu = make_cpu(bytes([0xE8, 0xFF]))
+    cpu.tracer = TraceRecorder(8)
+
+    with pytest.raises(NotImplementedError):
+        cpu.run()
+
+    assert [record[:2] for record in cpu.tracer.records()] == [(0x0000, 0xE8), (0x0001, 0xFF)]
@@ -0,0 +1,156 @@
+import itertools
+
+import pytest
+
+from emulator.cpu import CPU
+from emulator.memory import ReadOnlyMemoryError
+from emulator.opcodes import TEMPLATES
+from emulator.translator import BlockTranslator, compile_block
+
+# Register values and operand bytes around the carry and sign boundaries
+BYTES = (0x00, 0x01, 0x7F, 0x80, 0xFF)
+
+
+def test_translated_run_matches_interpreter(make_cpu):
+    """Running through blocks should end in the same state as CPU.run()"""
+    interpreted = make_cpu()
+    expected_steps = interpreted.run()
+
+    translated = make_cpu()
+    steps = BlockTranslator(translated).run()
+
+    assert steps == expected_steps
+    assert translated.x_register.get() == interpreted.x_register.get()
+    assert translated.program_counter.get() == interpreted.program_counter.get()
+    assert translated.memory.read_byte(0x0200) == 0x00
+    assert translated.alu.zero_flag == interpreted.alu.zero_flag
+    assert translated.alu.carry_flag == interpreted.alu.carry_flag
+
+
+def test_translated_arithmetic_flags_match_interpreter(program_cpu):
+    """Overflow from ADC/SBC and carry kept by loads survive a block's epilogue"""
+    source = "SEC\nLDA #$7F\nADC #$01\nLDX #$00\nSBC #$01\nDEX\nBRK"
+    interpreted = program_cpu(source)
+    interpreted.run()
+
+    translated = program_cpu(source)
+    BlockTranslator(translated).run()
+
+    assert translated.accumulator.get() == interpreted.accumulator.get()
+    assert translated.alu.status() == interpreted.alu.status()
+
+
+@pytest.mark.parametrize("opcode", sorted(TEMPLATES))
+def test_every_template_matches_its_handler(opcode, make_cpu):
+    """Each template must leave the state its generated handler leaves"""
+    for value, operand, carry in itertools.product(BYTES, BYTES, (False, True)):
+        program = bytes([opcode, operand, 0x03])  # Stores go to $03xx
+        interpreted, translated = make_cpu(program), make_cpu(program)
+        for cpu in (interpreted, translated):
+            cpu.accumulator.set(value)
+            cpu.x_register.set(value ^ 0x80)
+            cpu.y_register.set(value ^ 0x01)
+            cpu.alu.carry_flag = carry
+            cpu.alu.overflow_flag = True
+        interpreted.step()
+        translated.cycles += compile_block(translated, 0x0000, max_instructions=1).run()
+
+        assert translated.registers.a == interpreted.registers.a
+        assert translated.registers.x == interpreted.registers.x
+        assert translated.registers.y == interpreted.registers.y
+        assert translated.registers.pc == interpreted.registers.pc
+        assert translated.alu.status() == interpreted.alu.status()
+        assert translated.cycles == interpreted.cycles
+        assert translated.memory.dump(0x0300, 0x100) == interpreted.memory.dump(0x0300, 0x100)
+
+
+def test_blocks_are_cached_by_start_address(make_cpu):
+    """The loop body should be translated once and reused"""
+    cpu = make_cpu()
+    translator = BlockTranslator(cpu)
+    translator.run()
+
+    block = translator._blocks[0x0002]
+    assert (block.start, block.end, block.length) == (0x0002, 0x0008, 3)
+
+    cpu.program_counter.set(0x0000)
+    translator.run()
+    assert translator._blocks[0x0002] is block
+
+
+def test_write_into_block_invalidates_it(make_cpu):
+    """Patching code should drop the cached block covering it"""
+    cpu = make_cpu()
+    translator = BlockTranslator(cpu)
+    translator.run(max_steps=7)
+    assert 0x0002 in translator._blocks
+
+    cpu.memory.write_byte(0x0002, 0xE8)  # DEX -> INX
+
+    assert 0x0002 not in translator._blocks
+    assert 0x0000 not in translator._blocks
+
+
+def test_patched_code_runs_new_instructions(make_cpu):
+    """After invalidation the new bytes should be translated and executed"""
+    # LDA #$01 / STA $0200 / JMP $0000
+    cpu = make_cpu(bytes([0xA9, 0x01, 0x8D, 0x00, 0x02, 0x4C, 0x00, 0x00]))
+    translator = BlockTranslator(cpu)
+    translator.run(max_steps=3)
+    assert cpu.memory.read_byte(0x0200) == 0x01
+
+    cpu.memory.write_byte(0x0001, 0x07)  # LDA #$07
+    translator.run(max_steps=3)
+
+    assert cpu.memory.read_byte(0x0200) == 0x07
+
+
+def test_store_into_own_block_ends_the_block(make_cpu):
+    """A block that patches itself must not run the stale bytes it just wrote"""
+    # LDA #$E8 / STA $0005 / (DEX at $0005 becomes INX) / BRK
+    cpu = make_cpu(bytes([0xA9, 0xE8, 0x8D, 0x05, 0x00, 0xCA, 0x00]))
+    BlockTranslator(cpu).run()
+
+    assert cpu.x_register.get() == 0x01  # INX ran, not DEX
+
+
+def test_step_budget_and_until_pc_fall_back_to_stepping(make_cpu):
+    """Blocks that would overrun the budget or pass until_pc are stepped"""
+    cpu = make_cpu()
+    translator = BlockTranslator(cpu)
+
+    assert translator.run(max_steps=2) == 2
+    assert cpu.program_counter.get() == 0x0003
+
+    assert translator.run(until_pc=0x0006) == 1
+    assert cpu.program_counter.get() == 0x0006
+
+
+def test_untranslatable_opcodes_use_the_interpreter():
+    """Opcodes without a template should still execute via CPU.step()"""
+    cpu = CPU()
+    calls = []
+
+    def custom():
+        calls.append(True)
+        cpu.registers.pc += 1
+
+    cpu.register_opcode(0x02, custom)
+    cpu.memory.load(0x0000, bytes([0xE8, 0x02, 0xE8, 0x00]))  # INX / custom / INX / BRK
+
+    assert BlockTranslator(cpu).run() == 3
+    assert calls == [True]
+    assert cpu.x_register.get() == 0x02
+
+
+def test_store_that_raises_keeps_earlier_instructions(program_cpu):
+    """A store fault leaves registers and PC as the interpreter would"""
+    cpu = program_cpu("LDA #7\nLDX #9\nSTA $3000\nBRK")
+    cpu.memory.protect(0x3000, 0x3100)
+
+    with pytest.raises(ReadOnlyMemoryError):
+        BlockTranslator(cpu).run()
+
+    assert cpu.accumulator.get() == 0x07
+    assert cpu.x_register.get() == 0x09
+    assert cpu.program_counter.get() == 0x0204
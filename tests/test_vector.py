@@ -0,0 +1,95 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from emulator.opcodes import TEMPLATES
+from emulator.vector import VectorCPU
+
+# Run alongside the countdown
+PROGRAMS = [
+    # LDA #$FF / ADC #$02 / STA $0400 / BRK
+    [0xA9, 0xFF, 0x69, 0x02, 0x8D, 0x00, 0x04, 0x00],
+    # LDA #$42 / TAX / TAY / LDA #$00 / TXA / INY / STY $0300 / BRK
+    [0xA9, 0x42, 0xAA, 0xA8, 0xA9, 0x00, 0x8A, 0xC8, 0x8C, 0x00, 0x03, 0x00],
+    # LDA #$03 / LOOP: SBC #$01 / BEQ DONE / JMP LOOP / DONE: BRK
+    [0xA9, 0x03, 0xE9, 0x01, 0xF0, 0x03, 0x4C, 0x02, 0x00, 0x00],
+    # LDA #$7F / ADC #$01 / LDX #$00 / SBC #$01 / DEX / SBC #$80 / BRK
+    [0xA9, 0x7F, 0x69, 0x01, 0xA2, 0x00, 0xE9, 0x01, 0xCA, 0xE9, 0x80, 0x00],
+]
+
+
+def test_vector_cpu_matches_cpu_instruction_by_instruction(make_cpu, countdown):
+    """Every machine must track its scalar CPU after every lockstep step"""
+    programs = [list(countdown())] + PROGRAMS
+    vector = VectorCPU(len(programs))
+    cpus = []
+    for machine, program in enumerate(programs):
+        vector.load(0x0000, program, machine)
+        cpus.append(make_cpu(bytes(program)))
+
+    while vector.active.any():
+        vector.step()
+        for machine, cpu in enumerate(cpus):
+            if cpu.run(max_steps=1) == 0:
+                assert vector.halted[machine]
+                continue
+            assert vector.a[machine] == cpu.accumulator.get()
+            assert vector.x[machine] == cpu.x_register.get()
+            assert vector.y[machine] == cpu.y_register.get()
+            assert vector.pc[machine] == cpu.program_counter.get()
+            assert vector.zero_flag[machine] == cpu.alu.zero_flag
+            assert vector.negative_flag[machine] == cpu.alu.negative_flag
+            assert vector.carry_flag[machine] == cpu.alu.carry_flag
+            assert vector.overflow_flag[machine] == cpu.alu.overflow_flag
+
+    for machine, cpu in enumerate(cpus):
+        assert (vector.memory[machine] == np.frombuffer(cpu.memory._data, np.uint8)).all()
+
+
+@pytest.mark.parametrize("opcode", sorted(TEMPLATES))
+def test_every_template_matches_its_handler(opcode, make_cpu):
+    """One machine per starting state, each checked against a scalar CPU"""
+    states = [(value, operand, carry)
+              for value in (0x00, 0x01, 0x7F, 0x80, 0xFF)
+              for operand in (0x00, 0x01, 0x7F, 0x80, 0xFF)
+              for carry in (False, True)]
+    vector = VectorCPU(len(states))
+    vector.overflow[:] = 0x40
+    cpus = []
+    for machine, (value, operand, carry) in enumerate(states):
+        program = bytes([opcode, operand, 0x03])  # Stores go to $03xx
+        vector.load(0x0000, program, machine)
+        vector.a[machine], vector.x[machine], vector.y[machine] = value, value ^ 0x80, value ^ 0x01
+        vector.result[machine] = 0x101 if carry else 0x001
+        cpu = make_cpu(program)
+        cpu.accumulator.set(value)
+        cpu.x_register.set(value ^ 0x80)
+        cpu.y_register.set(value ^ 0x01)
+        cpu.alu.carry_flag = carry
+        cpu.alu.overflow_flag = True
+        cpu.step()
+        cpus.append(cpu)
+
+    assert vector.step() == len(states)
+    for machine, cpu in enumerate(cpus):
+        assert (vector.a[machine], vector.x[machine], vector.y[machine]) == (
+            cpu.accumulator.get(), cpu.x_register.get(), cpu.y_register.get())
+        assert vector.pc[machine] == cpu.program_counter.get()
+        assert vector.zero_flag[machine] == cpu.alu.zero_flag
+        assert vector.negative_flag[machine] == cpu.alu.negative_flag
+        assert vector.carry_flag[machine] == cpu.alu.carry_flag
+        assert vector.overflow_flag[machine] == cpu.alu.overflow_flag
+        assert (vector.memory[machine] == np.frombuffer(cpu.memory._data, np.uint8)).all()
+
+
+def test_halted_and_faulted_machines_leave_the_active_mask():
+    """BRK halts a machine and an unknown opcode faults it"""
+    vector = VectorCPU(3)
+    vector.load(0x0000, [0xEA, 0x00], 0)  # NOP / BRK
+    vector.load(0x0000, [0xEA, 0xFF], 1)  # NOP / unknown
+    vector.load(0x0000, [0xEA, 0x4C, 0x00, 0x00], 2)  # NOP / JMP $0000
+
+    assert vector.run(max_steps=10) == 10
+    assert vector.active.tolist() == [False, False, True]
+    assert vector.halted[0] and vector.faulted[1]
+    assert vector.pc[0] == 0x0001 and vector.pc[1] == 0x0001